@@ -0,0 +1,77 @@
+"""
+Synthetic order generators for the benchmarks.
+
+Every generator takes the number of orders and a seed and returns a list of orders,
+so a benchmark run can be reproduced exactly.
+"""
+from __future__ import annotations
+import random
+from typing import Callable, Dict, List
+
+from coral.core import Order
+
+
+def uniform(count: int, seed: int = 0) -> List[Order]:
+    """
+    Buy and sell orders with prices and quantities drawn uniformly from overlapping
+    ranges, so almost every order has its own level.
+    """
+    rng = random.Random(seed)
+    return [
+        Order(user_id=f"U{i}", order_type="BUY" if rng.random() < 0.5 else "SELL",
+              q=rng.randint(1, 1000), p=round(rng.uniform(90, 110), 2))
+        for i in range(count)
+    ]
+
+
+def ties(count: int, seed: int = 0) -> List[Order]:
+    """
+    Orders drawn from a handful of prices and quantities, so most of them share an
+    `AuctionOrder` with many others.
+    """
+    rng = random.Random(seed)
+    return [
+        Order(user_id=f"U{i}", order_type="BUY" if rng.random() < 0.5 else "SELL",
+              q=rng.choice((10, 50, 100)), p=rng.choice((99, 100, 101)))
+        for i in range(count)
+    ]
+
+
+def wide_spread(count: int, seed: int = 0) -> List[Order]:
+    """
+    Buy prices well below sell prices except for a thin overlapping band, so the
+    matching stops after a few levels.
+    """
+    rng = random.Random(seed)
+    orders = []
+    for i in range(count):
+        if rng.random() < 0.5:
+            orders.append(Order(user_id=f"U{i}", order_type="BUY",
+                                q=rng.randint(1, 1000), p=round(rng.uniform(1, 101), 2)))
+        else:
+            orders.append(Order(user_id=f"U{i}", order_type="SELL",
+                                q=rng.randint(1, 1000), p=round(rng.uniform(100, 200), 2)))
+    return orders
+
+
+def one_sided(count: int, seed: int = 0) -> List[Order]:
+    """
+    A deep book of buy orders against a few sell orders, all of them crossing, so
+    the matching walks a long run of buy levels.
+    """
+    rng = random.Random(seed)
+    sellers = max(1, count // 100)
+    return [
+        Order(user_id=f"U{i}", order_type="SELL" if i < sellers else "BUY",
+              q=rng.randint(1, 1000) * (100 if i < sellers else 1),
+              p=round(rng.uniform(90, 100), 2) if i < sellers else round(rng.uniform(100, 110), 2))
+        for i in range(count)
+    ]
+
+
+GENERATORS: Dict[str, Callable[[int, int], List[Order]]] = {
+    "uniform": uniform,
+    "ties": ties,
+    "wide_spread": wide_spread,
+    "one_sided": one_sided,
+}
@@ -0,0 +1,89 @@
+"""
+Times the phases of an auction over synthetic books of growing size.
+
+For every generator and size it measures, separately, the construction of the
+`AuctionManager`, `allocate_orders` and a full `run_auction`, keeping the best of a
+number of repetitions. Each measurement is printed and appended as a JSON line to
+the results file, tagged with the current commit, so runs can be compared over time.
+
+Usage:
+
+    python benchmarks/run.py --max-size 1000000 --generator uniform --generator ties
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import platform
+import subprocess
+import time
+from datetime import datetime, timezone
+from typing import Callable, Dict, List
+
+from generators import GENERATORS
+
+from coral.core import AuctionManager, Order, run_auction
+
+BENCHMARKS = os.path.dirname(os.path.abspath(__file__))
+
+
+def best_of(repeat: int, setup: Callable[[], object], action: Callable[[object], object]) -> float:
+    timings = []
+    for _ in range(repeat):
+        state = setup()
+        start = time.perf_counter()
+        action(state)
+        timings.append(time.perf_counter() - start)
+    return min(timings)
+
+
+def measure(orders: List[Order], repeat: int, engine: str) -> Dict[str, float]:
+    return {
+        "construction": best_of(repeat, lambda: orders, AuctionManager),
+        "allocate_orders": best_of(repeat, lambda: AuctionManager(orders),
+                                   lambda manager: manager.allocate_orders()),
+        "run_auction": best_of(repeat, lambda: orders, lambda orders: run_auction(orders, engine=engine)),
+    }
+
+
+def commit() -> str:
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], capture_output=True, text=True,
+                              check=True, cwd=BENCHMARKS).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--min-size", type=int, default=100)
+    parser.add_argument("--max-size", type=int, default=100_000)
+    parser.add_argument("--generator", action="append", choices=sorted(GENERATORS),
+                        help="generators to run, all of them by default")
+    parser.add_argument("--engine", default="python", help="engine used by run_auction")
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--output", default=os.path.join(BENCHMARKS, "results.ndjson"),
+                        help="results file, benchmarks/results.ndjson by default")
+    args = parser.parse_args()
+
+    run = {
+        "commit": commit(),
+        "python": platform.python_version(),
+        "date": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "engine": args.engine,
+    }
+    with open(args.output, "a") as output:
+        for name in args.generator or sorted(GENERATORS):
+            size = args.min_size
+            while size <= args.max_size:
+                orders = GENERATORS[name](size, args.seed)
+                timings = measure(orders, args.repeat, args.engine)
+                print(f"{name:>12} {size:>10} " + " ".join(
+                    f"{phase}={seconds:.6f}s" for phase, seconds in timings.items()), flush=True)
+                output.write(json.dumps({**run, "generator": name, "size": size, **timings}) + "\n")
+                size *= 10
+
+
+if __name__ == "__main__":
+    main()
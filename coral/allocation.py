@@ -0,0 +1,118 @@
+"""
+Per-user allocation report.
+
+`run_auction` only returns the aggregated result of the auction. The allocation
+report splits the shares allocated to each `AuctionOrder` back to the orders it
+aggregates, returning the fill of every order as a column.
+"""
+from __future__ import annotations
+from array import array
+from dataclasses import dataclass
+from typing import Dict, List, Literal, Sequence, Union
+
+from coral.batch import OrderBatch, side_code
+from coral.compact import CompactAuction
+from coral.core import AuctionManager, AuctionResult, Order
+
+
+@dataclass(slots=True)
+class AllocationReport:
+    """
+    Columnar report of the shares allocated to each order, in input order.
+
+    Attributes
+    ----------
+    result : AuctionResult
+        the aggregated result of the auction
+    user_ids : Sequence[str]
+        unique identifier of the user of each order
+    side : Sequence[int]
+        side code of each order, `BUY` (1) or `SELL` (0)
+    q : Sequence[float]
+        quantity of shares of each order
+    p : Sequence[float]
+        price of each order
+    filled : Sequence[float]
+        number of shares allocated to each order
+    """
+    result: AuctionResult
+    user_ids: Sequence[str]
+    side: Sequence[int]
+    q: Sequence[float]
+    p: Sequence[float]
+    filled: Sequence[float]
+
+    def __len__(self) -> int:
+        return len(self.filled)
+
+    def fills(self) -> Dict[str, float]:
+        """
+        Returns the shares allocated to each user.
+        """
+        fills: Dict[str, float] = {}
+        for user_id, filled in zip(self.user_ids, self.filled):
+            fills[user_id] = fills.get(user_id, 0) + filled
+        return fills
+
+
+def allocation_report(orders: Union[List[Order], OrderBatch], whole_shares: bool = False,
+                      engine: Literal['python', 'numpy', 'compact'] = "python") -> AllocationReport:
+    """
+    Runs an auction and reports the shares allocated to each order.
+
+    Every `AuctionOrder` is either fulfilled, untouched or, for at most one of them
+    on each side, partially allocated. The shares of the partially allocated one are
+    divided pro-rata between its orders (see `AuctionOrder.split_allocation`).
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders that take part in the auction
+    whole_shares : bool
+        if `True` the pro-rata split only allocates whole shares, handing out the
+        remaining ones by largest remainder
+    engine : Literal["python", "numpy", "compact"]
+        "python" splits the allocations of an `AuctionManager`, "compact" those of a
+        `CompactAuction` (see `coral.compact`), while "numpy" computes them from
+        columnar arrays with `coral.vectorized` (requires numpy)
+
+    Returns
+    -------
+    report : AllocationReport
+        the fill of every order
+    """
+    if engine == "numpy":
+        from coral.vectorized import allocation_report_numpy
+        return allocation_report_numpy(orders, whole_shares)
+    if engine not in ("python", "compact"):
+        raise ValueError(f"unknown auction engine: {engine}")
+    if isinstance(orders, OrderBatch):
+        orders = list(orders)
+    if engine == "compact":
+        auction = CompactAuction(orders)
+        result = auction.clear()
+        levels = auction.buy_levels + auction.sell_levels
+    else:
+        manager = AuctionManager(orders)
+        manager.allocate_orders()
+        result = AuctionResult(q_max=manager.allocated, p_min=manager.p_min, p_max=manager.p_max)
+        levels = manager.buy_orders + manager.sell_orders
+    # The same order may appear more than once, so positions are queued by identity.
+    positions: Dict[int, List[int]] = {}
+    for index, order in enumerate(orders):
+        positions.setdefault(id(order), []).append(index)
+    filled = array("d", bytes(8 * len(orders)))
+    for level in levels:
+        if not level.allocated:
+            continue
+        shares = level.split_allocation(whole_shares)
+        for order, share in zip(level.orders, shares):
+            filled[positions[id(order)].pop(0)] = share
+    return AllocationReport(
+        result=result,
+        user_ids=[order.user_id for order in orders],
+        side=array("b", (side_code(order.order_type) for order in orders)),
+        q=array("d", (order.q for order in orders)),
+        p=array("d", (order.p for order in orders)),
+        filled=filled,
+    )
@@ -0,0 +1,118 @@
+"""
+Columnar representation of a list of orders.
+
+An `OrderBatch` keeps one typed array per attribute instead of one `Order` object per
+order, which is much cheaper to hold in memory and can wrap buffers coming from
+other sources (`array.array`, `numpy.ndarray`, `mmap`, ...) without copying them.
+"""
+from __future__ import annotations
+from array import array
+from typing import Iterable, Iterator, Sequence
+
+from coral.core import Order
+
+BUY = 1
+"""Side code of a "BUY" order."""
+SELL = 0
+"""Side code of a "SELL" order."""
+
+
+def side_code(order_type: str) -> int:
+    """
+    Returns the side code of an order type. As in `AuctionManager`, every order that
+    is not a "BUY" order is treated as a "SELL" order.
+    """
+    return BUY if order_type == "BUY" else SELL
+
+
+class OrderBatch(object):
+    """
+    Columnar batch of orders.
+
+    The columns are stored as given, so any object that supports `len` and indexing
+    can be used. Typed arrays (`array.array`, `numpy.ndarray`, `memoryview`) are
+    wrapped without copies by the numpy engine.
+
+    Attributes
+    ----------
+    user_ids : Sequence[str]
+        unique identifier of the user of each order
+    side : Sequence[int]
+        side code of each order, `BUY` (1) or `SELL` (0)
+    q : Sequence[float]
+        quantity of shares of each order
+    p : Sequence[float]
+        price of each order
+    """
+    __slots__ = ("user_ids", "side", "q", "p")
+
+    def __init__(self, user_ids: Sequence[str], side: Sequence[int], q: Sequence[float], p: Sequence[float]):
+        """
+        Constructs an OrderBatch from its columns.
+
+        Parameters
+        ----------
+        user_ids : Sequence[str]
+            unique identifier of the user of each order
+        side : Sequence[int]
+            side code of each order, `BUY` (1) or `SELL` (0)
+        q : Sequence[float]
+            quantity of shares of each order
+        p : Sequence[float]
+            price of each order
+
+        Raises
+        ------
+        ValueError
+            if the columns don't have the same length
+        """
+        if not len(user_ids) == len(side) == len(q) == len(p):
+            raise ValueError("all the OrderBatch columns must have the same length")
+        self.user_ids = user_ids
+        self.side = side
+        self.q = q
+        self.p = p
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order]) -> OrderBatch:
+        """
+        Builds an OrderBatch backed by `array.array` columns from a list of orders.
+
+        Parameters
+        ----------
+        orders : Iterable[Order]
+            orders to store in the batch
+
+        Returns
+        -------
+        batch : OrderBatch
+            the columnar batch
+        """
+        user_ids = []
+        side = array("b")
+        q = array("d")
+        p = array("d")
+        for order in orders:
+            user_ids.append(order.user_id)
+            side.append(side_code(order.order_type))
+            q.append(order.q)
+            p.append(order.p)
+        return cls(user_ids, side, q, p)
+
+    def __len__(self) -> int:
+        return len(self.side)
+
+    def __getitem__(self, index: int) -> Order:
+        return Order(
+            user_id=self.user_ids[index],
+            order_type="BUY" if self.side[index] == BUY else "SELL",
+            q=self.q[index],
+            p=self.p[index],
+        )
+
+    def __iter__(self) -> Iterator[Order]:
+        """
+        Yields an `Order` for each row of the batch, creating them lazily.
+        """
+        for user_id, side, q, p in zip(self.user_ids, self.side, self.q, self.p):
+            yield Order(user_id=user_id, order_type="BUY" if side == BUY else "SELL", q=q, p=p)
@@ -0,0 +1,180 @@
+"""
+Fixed-width binary order files.
+
+A binary order file stores an `OrderBatch` column by column so it can be memory
+mapped and cleared without parsing it or creating one object per order. The layout,
+in little-endian byte order, is:
+
+- a 24 bytes header: the `CORALOB1` magic, the format version (uint32), the width
+  of the user id column (uint32) and the number of orders (uint64)
+- the side codes (int8), padded to a multiple of 8 bytes
+- the quantities (float64)
+- the prices (float64)
+- the user ids, UTF-8 encoded and padded with null bytes to the column width
+"""
+from __future__ import annotations
+import io
+import mmap
+import struct
+import sys
+from array import array
+from collections.abc import Sequence
+from typing import BinaryIO, Iterable, Union
+
+from coral.batch import OrderBatch
+from coral.core import Order
+
+MAGIC = b"CORALOB1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQ")
+
+
+class FixedWidthStrings(Sequence):
+    """
+    Read-only sequence of strings stored in a fixed-width, null padded buffer. The
+    strings are decoded on access.
+    """
+    __slots__ = ("buffer", "width", "count")
+
+    def __init__(self, buffer: memoryview, width: int, count: int):
+        self.buffer = buffer
+        self.width = width
+        self.count = count
+
+    def __len__(self) -> int:
+        return self.count
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return [self[i] for i in range(*index.indices(len(self)))]
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("FixedWidthStrings index out of range")
+        start = index * self.width
+        return bytes(self.buffer[start:start + self.width]).rstrip(b"\0").decode("utf-8")
+
+
+def _padded(size: int) -> int:
+    return (size + 7) // 8 * 8
+
+
+def _write(file: BinaryIO, orders: Union[Iterable[Order], OrderBatch]) -> None:
+    if not isinstance(orders, OrderBatch):
+        orders = OrderBatch.from_orders(orders)
+    count = len(orders)
+    user_ids = [user_id.encode("utf-8") for user_id in orders.user_ids]
+    width = max(map(len, user_ids), default=0)
+    side = array("b", orders.side)
+    q = array("d", orders.q)
+    p = array("d", orders.p)
+    if sys.byteorder != "little":
+        q.byteswap()
+        p.byteswap()
+    file.write(HEADER.pack(MAGIC, VERSION, width, count))
+    file.write(side.tobytes())
+    file.write(bytes(_padded(count) - count))
+    file.write(q.tobytes())
+    file.write(p.tobytes())
+    for user_id in user_ids:
+        file.write(user_id.ljust(width, b"\0"))
+
+
+def write_orders(path: str, orders: Union[Iterable[Order], OrderBatch]) -> None:
+    """
+    Writes a list of orders to a binary order file.
+
+    Parameters
+    ----------
+    path : str
+        path of the file to write
+    orders : Iterable[Order] | OrderBatch
+        orders to store
+    """
+    with open(path, "wb") as file:
+        _write(file, orders)
+
+
+def dumps_orders(orders: Union[Iterable[Order], OrderBatch]) -> bytes:
+    """
+    Returns the content of the binary order file of a list of orders.
+    """
+    file = io.BytesIO()
+    _write(file, orders)
+    return file.getvalue()
+
+
+def loads_orders(buffer) -> OrderBatch:
+    """
+    Reads the orders of a buffer holding a binary order file.
+
+    The columns of the batch are views over the buffer, so nothing is copied until
+    it is read.
+
+    Parameters
+    ----------
+    buffer : bytes | bytearray | memoryview | mmap.mmap
+        content of a binary order file
+
+    Returns
+    -------
+    batch : OrderBatch
+        the stored orders
+
+    Raises
+    ------
+    ValueError
+        if the buffer doesn't hold a binary order file
+    """
+    buffer = memoryview(buffer)
+    if len(buffer) < HEADER.size:
+        raise ValueError("not a binary order file")
+    magic, version, width, count = HEADER.unpack(buffer[:HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not a binary order file")
+    if len(buffer) < HEADER.size + _padded(count) + 16 * count + width * count:
+        raise ValueError("truncated binary order file")
+    offset = HEADER.size
+    side = buffer[offset:offset + count].cast("b")
+    offset += _padded(count)
+    q = buffer[offset:offset + 8 * count].cast("d")
+    offset += 8 * count
+    p = buffer[offset:offset + 8 * count].cast("d")
+    offset += 8 * count
+    user_ids = FixedWidthStrings(buffer[offset:offset + width * count], width, count)
+    if sys.byteorder != "little":
+        q = array("d", q)
+        p = array("d", p)
+        q.byteswap()
+        p.byteswap()
+    return OrderBatch(user_ids, side, q, p)
+
+
+def load_orders(path: str) -> OrderBatch:
+    """
+    Memory maps a binary order file as an `OrderBatch`.
+
+    The columns of the batch are views over the mapped file, so nothing is copied
+    until it is read. The file stays mapped while the batch, or any of its columns,
+    is alive.
+
+    Parameters
+    ----------
+    path : str
+        path of the binary order file
+
+    Returns
+    -------
+    batch : OrderBatch
+        the orders stored in the file
+
+    Raises
+    ------
+    ValueError
+        if the file is not a binary order file
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not a binary order file")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads_orders(buffer)
@@ -0,0 +1,255 @@
+"""
+Persistent order book for repeated call auctions.
+
+The `OrderBook` keeps its orders grouped in price/quantity levels between auctions,
+so adding, cancelling or amending an order doesn't require rebuilding the book, and
+clearing it doesn't consume it.
+"""
+from __future__ import annotations
+import random
+from typing import Dict, Iterable, Iterator, Optional, Tuple
+
+from coral.core import (AuctionManager, AuctionOrder, AuctionResult, Order, buy_priority,
+                        clear_levels, sell_priority)
+
+Key = Tuple[float, float]
+
+
+class _SortedKeys(object):
+    # Skip list of level keys. Keys are added and removed in O(log L) expected time
+    # for L levels, instead of shifting the tail of a sorted list, and iterated in
+    # order. A node is a list with its key followed by its forward links. Heights are
+    # drawn from a private generator, so callers that seed `random` keep their stream.
+    __slots__ = ("_head", "_height", "_random")
+    MAX_HEIGHT = 32
+
+    def __init__(self):
+        self._head: list = [None] * (self.MAX_HEIGHT + 1)
+        self._height = 1
+        self._random = random.Random()
+
+    def __iter__(self) -> Iterator[Key]:
+        node = self._head[1]
+        while node is not None:
+            yield node[0]
+            node = node[1]
+
+    def _predecessors(self, key: Key) -> list:
+        # Last node before `key` on each height.
+        predecessors = [self._head] * self.MAX_HEIGHT
+        node = self._head
+        for height in range(self._height, 0, -1):
+            following = node[height]
+            while following is not None and following[0] < key:
+                node = following
+                following = node[height]
+            predecessors[height - 1] = node
+        return predecessors
+
+    def add(self, key: Key) -> None:
+        predecessors = self._predecessors(key)
+        # Each node reaches the next height with probability 1/2.
+        height = 1
+        bits = self._random.getrandbits(self.MAX_HEIGHT - 1)
+        while bits & 1:
+            height += 1
+            bits >>= 1
+        self._height = max(self._height, height)
+        node = [key] + [None] * height
+        for index in range(1, height + 1):
+            predecessor = predecessors[index - 1]
+            node[index] = predecessor[index]
+            predecessor[index] = node
+
+    def remove(self, key: Key) -> None:
+        predecessors = self._predecessors(key)
+        node = predecessors[0][1]
+        for index in range(1, len(node)):
+            predecessors[index - 1][index] = node[index]
+        while self._height > 1 and self._head[self._height] is None:
+            self._height -= 1
+
+
+class OrderBook(object):
+    """
+    Long-lived book of orders keyed by `user_id`.
+
+    Each user holds at most one order. Orders with equal price and quantity share a
+    level, exactly as in `AuctionManager`, and the level keys of each side are kept in
+    a skip list sorted according to the user's willingness, so a level is created or
+    dropped in O(log L) expected time for L levels. Orders are added to and removed
+    from an existing level in constant time.
+
+    Attributes
+    ----------
+    orders : Dict[str, Order]
+        current order of each user
+    """
+    orders: Dict[str, Order]
+
+    def __init__(self, orders: Iterable[Order] = ()):
+        """
+        Constructs an OrderBook with an optional initial list of orders.
+
+        Parameters
+        ----------
+        orders : Iterable[Order]
+            initial orders of the book
+        """
+        self.orders = {}
+        self._buy_keys = _SortedKeys()
+        self._sell_keys = _SortedKeys()
+        self._buy_levels: Dict[Key, Dict[str, Order]] = {}
+        self._sell_levels: Dict[Key, Dict[str, Order]] = {}
+        for order in orders:
+            self.insert(order)
+
+    def __len__(self) -> int:
+        return len(self.orders)
+
+    def __contains__(self, user_id: str) -> bool:
+        return user_id in self.orders
+
+    def __iter__(self) -> Iterator[Order]:
+        """
+        Yields the buy orders and then the sell orders, sorted according to the user's
+        willingness and, inside each level, by arrival.
+        """
+        for key in self._buy_keys:
+            yield from self._buy_levels[key].values()
+        for key in self._sell_keys:
+            yield from self._sell_levels[key].values()
+
+    def _side(self, order: Order):
+        if order.order_type == "BUY":
+            return buy_priority(order), self._buy_keys, self._buy_levels
+        return sell_priority(order), self._sell_keys, self._sell_levels
+
+    def insert(self, order: Order) -> None:
+        """
+        Adds an order to the book.
+
+        Parameters
+        ----------
+        order : Order
+            order to add
+
+        Raises
+        ------
+        ValueError
+            if the user already has an order in the book
+        """
+        if order.user_id in self.orders:
+            raise ValueError(f"user {order.user_id} already has an order in the book")
+        key, keys, levels = self._side(order)
+        level = levels.get(key)
+        if level is None:
+            keys.add(key)
+            level = levels[key] = {}
+        level[order.user_id] = order
+        self.orders[order.user_id] = order
+
+    def cancel(self, user_id: str) -> Order:
+        """
+        Removes the order of a user from the book.
+
+        Parameters
+        ----------
+        user_id : str
+            user whose order should be removed
+
+        Returns
+        -------
+        order : Order
+            the removed order
+
+        Raises
+        ------
+        KeyError
+            if the user has no order in the book
+        """
+        order = self.orders.pop(user_id)
+        key, keys, levels = self._side(order)
+        level = levels[key]
+        del level[user_id]
+        if not level:
+            del levels[key]
+            keys.remove(key)
+        return order
+
+    def amend(self, user_id: str, q: Optional[float] = None, p: Optional[float] = None) -> Order:
+        """
+        Changes the quantity and/or price of the order of a user.
+
+        The amended order loses its place inside its level, as if it had been
+        cancelled and inserted again.
+
+        Parameters
+        ----------
+        user_id : str
+            user whose order should be amended
+        q : float | None
+            new quantity of shares, or `None` to keep the current one
+        p : float | None
+            new price, or `None` to keep the current one
+
+        Returns
+        -------
+        order : Order
+            the amended order
+
+        Raises
+        ------
+        KeyError
+            if the user has no order in the book
+        """
+        order = self.cancel(user_id)
+        amended = Order(
+            user_id=user_id,
+            order_type=order.order_type,
+            q=order.q if q is None else q,
+            p=order.p if p is None else p,
+        )
+        self.insert(amended)
+        return amended
+
+    def _levels(self, keys: _SortedKeys, levels: Dict[Key, Dict[str, Order]]) -> Iterator[Tuple[float, float]]:
+        for key in keys:
+            level = levels[key]
+            first = next(iter(level.values()))
+            yield first.p, first.q * len(level)
+
+    def clear(self) -> AuctionResult:
+        """
+        Runs an auction over the current orders without modifying the book.
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction
+        """
+        return clear_levels(
+            self._levels(self._buy_keys, self._buy_levels),
+            self._levels(self._sell_keys, self._sell_levels),
+        )
+
+    def to_manager(self) -> AuctionManager:
+        """
+        Builds an `AuctionManager` with the current orders, reusing the sorted levels.
+
+        Returns
+        -------
+        manager : AuctionManager
+            a new manager, ready to allocate the orders
+        """
+        manager = AuctionManager([])
+        manager.buy_orders = [self._auction_order(self._buy_levels[key], "BUY")
+                              for key in self._buy_keys]
+        manager.sell_orders = [self._auction_order(self._sell_levels[key], "SELL")
+                               for key in self._sell_keys]
+        return manager
+
+    @staticmethod
+    def _auction_order(level: Dict[str, Order], order_type: str) -> AuctionOrder:
+        orders = list(level.values())
+        return AuctionOrder(q=orders[0].q, p=orders[0].p, order_type=order_type, orders=orders)
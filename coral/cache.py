@@ -0,0 +1,201 @@
+"""
+Content-addressed cache of auction results.
+
+The result of an auction only depends on the multiset of `(order_type, p, q)` of its
+orders, so the cache key is a SHA-256 digest of those triples, counted and sorted,
+which doesn't depend on the order of the orders nor on their user ids. Computing the
+key takes a single pass over the orders, and a hit skips the construction of the
+book and the matching.
+
+Results are kept in memory with LRU eviction and, optionally, in a directory with
+one JSON file per key so they survive process restarts. The directory is bounded as
+well: once it holds too many files, the least recently used ones, by modification
+time, are deleted.
+"""
+from __future__ import annotations
+import hashlib
+import json
+import os
+import struct
+import tempfile
+import threading
+from collections import Counter, OrderedDict
+from dataclasses import asdict, replace
+from typing import List, Optional, Union
+
+from coral.batch import OrderBatch, side_code
+from coral.core import AuctionResult, Order
+
+RECORD = struct.Struct("<bddQ")
+
+
+def order_key(orders: Union[List[Order], OrderBatch]) -> str:
+    """
+    Returns the canonical, order-insensitive digest of a list of orders.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        orders of the auction
+
+    Returns
+    -------
+    key : str
+        hexadecimal SHA-256 digest of the `(order_type, p, q)` multiset
+
+    Raises
+    ------
+    ValueError
+        if the orders are neither a sequence nor an `OrderBatch`, as hashing them
+        would consume them
+    """
+    if isinstance(orders, OrderBatch):
+        counts = Counter(zip(orders.side, map(float, orders.p), map(float, orders.q)))
+    elif isinstance(orders, (list, tuple)):
+        counts = Counter((side_code(order.order_type), float(order.p), float(order.q)) for order in orders)
+    else:
+        raise ValueError("only lists of orders and OrderBatches can be cached")
+    digest = hashlib.sha256()
+    for (side, p, q), count in sorted(counts.items()):
+        digest.update(RECORD.pack(side, p, q, count))
+    return digest.hexdigest()
+
+
+class AuctionCache(object):
+    """
+    LRU cache of auction results keyed by `order_key`.
+
+    Attributes
+    ----------
+    max_entries : int
+        maximum number of results kept in memory
+    path : str | None
+        directory of the on-disk tier, or `None` to keep the results only in memory
+    max_disk_entries : int | None
+        maximum number of results kept in the directory, or `None` for no limit
+    hits : int
+        number of lookups answered by the cache
+    misses : int
+        number of lookups not found in the cache
+    """
+    max_entries: int
+    path: Optional[str]
+    max_disk_entries: Optional[int]
+    hits: int
+    misses: int
+
+    def __init__(self, max_entries: int = 1024, path: Optional[str] = None,
+                 max_disk_entries: Optional[int] = 65536):
+        """
+        Constructs an AuctionCache. The results already stored in `path` are kept.
+
+        Parameters
+        ----------
+        max_entries : int
+            maximum number of results kept in memory
+        path : str | None
+            directory of the on-disk tier, created if it doesn't exist
+        max_disk_entries : int | None
+            maximum number of results kept in the directory, the least recently used
+            files are deleted beyond it. `None` disables the limit
+        """
+        self.max_entries = max_entries
+        self.path = path
+        self.max_disk_entries = max_disk_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries: OrderedDict[str, AuctionResult] = OrderedDict()
+        # Keys of the files of the directory, least recently used first.
+        self._files: OrderedDict[str, None] = OrderedDict()
+        self._lock = threading.Lock()
+        if path is not None:
+            os.makedirs(path, exist_ok=True)
+            with os.scandir(path) as entries:
+                files = [(entry.stat().st_mtime, entry.name[:-len(".json")]) for entry in entries
+                         if entry.name.endswith(".json")]
+            self._files.update((key, None) for _, key in sorted(files))
+            self._prune()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def key(self, orders: Union[List[Order], OrderBatch]) -> str:
+        """
+        Returns the cache key of a list of orders (see `order_key`).
+        """
+        return order_key(orders)
+
+    def _file(self, key: str) -> str:
+        return os.path.join(self.path, f"{key}.json")
+
+    def _touch(self, key: str) -> None:
+        self._files[key] = None
+        self._files.move_to_end(key)
+
+    def _prune(self) -> None:
+        # Deletes the least recently used files beyond `max_disk_entries`. Files that
+        # another process already deleted are skipped.
+        if self.max_disk_entries is None:
+            return
+        while len(self._files) > self.max_disk_entries:
+            key, _ = self._files.popitem(last=False)
+            try:
+                os.remove(self._file(key))
+            except FileNotFoundError:
+                pass
+
+    def _remember(self, key: str, result: AuctionResult) -> None:
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def get(self, key: str) -> Optional[AuctionResult]:
+        """
+        Returns a copy of the result stored for a key, or `None` if there is none.
+        """
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            elif self.path is not None:
+                try:
+                    with open(self._file(key)) as file:
+                        result = AuctionResult(**json.load(file))
+                except FileNotFoundError:
+                    self._files.pop(key, None)
+                else:
+                    self._remember(key, result)
+                    # Refresh the modification time, so the file is evicted last.
+                    try:
+                        os.utime(self._file(key))
+                    except FileNotFoundError:
+                        pass
+                    self._touch(key)
+            if result is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+            return replace(result)
+
+    def put(self, key: str, result: AuctionResult) -> None:
+        """
+        Stores the result of an auction.
+        """
+        with self._lock:
+            self._remember(key, replace(result))
+            if self.path is not None:
+                # Write to a temporary file first, so readers never see partial files.
+                descriptor, temporary = tempfile.mkstemp(dir=self.path, suffix=".tmp")
+                with os.fdopen(descriptor, "w") as file:
+                    json.dump(asdict(result), file)
+                os.replace(temporary, self._file(key))
+                self._touch(key)
+                self._prune()
+
+    def clear(self) -> None:
+        """
+        Forgets the results kept in memory. The on-disk tier is left untouched.
+        """
+        with self._lock:
+            self._entries.clear()
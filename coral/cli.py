@@ -0,0 +1,201 @@
+"""
+Command line tool that clears a set of order files.
+
+Every NDJSON or CSV file is one auction. The files are parsed by a bounded pool of
+worker processes, which hand them back as binary order buffers (see `coral.binary`),
+so the parsing of the next files overlaps with the matching of the current one.
+Binary order files (`.bin`) are memory mapped instead of parsed.
+
+The result of every auction is written as a JSON line and a throughput summary is
+printed to stderr once all the files are cleared.
+
+Usage:
+
+    coral orders/ 'archive/*.ndjson' --engine compact --workers 4 --output results.ndjson
+"""
+from __future__ import annotations
+import argparse
+import glob
+import json
+import os
+import sys
+import time
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from dataclasses import asdict, dataclass
+from typing import Deque, Iterable, List, Optional, TextIO, Tuple
+
+from coral.binary import dumps_orders, load_orders, loads_orders
+from coral.core import run_auction
+from coral.streaming import CSV_SUFFIXES, NDJSON_SUFFIXES, read_orders
+
+BINARY_SUFFIXES = (".bin",)
+SUFFIXES = NDJSON_SUFFIXES + CSV_SUFFIXES + BINARY_SUFFIXES
+
+
+@dataclass(slots=True)
+class Throughput:
+    """
+    Summary of a batch run.
+
+    Attributes
+    ----------
+    auctions : int
+        number of cleared auctions
+    orders : int
+        number of cleared orders
+    failed : int
+        number of files that couldn't be cleared
+    parse : float
+        seconds spent parsing files, added over all the workers
+    wait : float
+        seconds the matching waited for parsed files
+    match : float
+        seconds spent running the auctions
+    write : float
+        seconds spent writing the results
+    elapsed : float
+        wall clock seconds of the whole run
+    """
+    auctions: int = 0
+    orders: int = 0
+    failed: int = 0
+    parse: float = 0
+    wait: float = 0
+    match: float = 0
+    write: float = 0
+    elapsed: float = 0
+
+    def render(self) -> str:
+        elapsed = self.elapsed or float("inf")
+        return (f"{self.auctions} auctions, {self.orders} orders, {self.failed} failed in {self.elapsed:.3f}s "
+                f"({self.orders / elapsed:.0f} orders/s, {self.auctions / elapsed:.1f} auctions/s)\n"
+                f"parse={self.parse:.3f}s wait={self.wait:.3f}s match={self.match:.3f}s write={self.write:.3f}s")
+
+
+def find_order_files(patterns: Iterable[str]) -> List[str]:
+    """
+    Expands directories and glob patterns into a sorted list of order files.
+
+    Directories contribute the files with a supported extension that they contain,
+    without recursing. Each file is only returned once.
+    """
+    paths = []
+    for pattern in patterns:
+        if os.path.isdir(pattern):
+            paths.extend(os.path.join(pattern, name) for name in os.listdir(pattern)
+                         if os.path.splitext(name)[1].lower() in SUFFIXES)
+        else:
+            paths.extend(glob.glob(pattern) or [pattern])
+    return sorted(set(paths))
+
+
+def _parse(path: str) -> Tuple[bytes, float]:
+    start = time.perf_counter()
+    buffer = dumps_orders(read_orders(path))
+    return buffer, time.perf_counter() - start
+
+
+def _load(executor: ProcessPoolExecutor, path: str) -> Future:
+    if os.path.splitext(path)[1].lower() in BINARY_SUFFIXES:
+        future = Future()
+        start = time.perf_counter()
+        try:
+            future.set_result((load_orders(path), time.perf_counter() - start))
+        except Exception as error:
+            future.set_exception(error)
+        return future
+    return executor.submit(_parse, path)
+
+
+def clear_files(paths: List[str], output: TextIO, engine: str = "python", workers: Optional[int] = None,
+                prefetch: Optional[int] = None) -> Throughput:
+    """
+    Clears every order file, writing one JSON line per auction to `output`.
+
+    The lines hold the `file`, the number of `orders` and the `AuctionResult`, or an
+    `error` message if the file couldn't be cleared. They are written in the order of
+    `paths`.
+
+    Parameters
+    ----------
+    paths : List[str]
+        order files to clear
+    output : TextIO
+        text stream the results are written to
+    engine : str
+        engine used by `run_auction`
+    workers : int | None
+        number of processes that parse the files, by default the number of CPUs
+    prefetch : int | None
+        maximum number of files parsed ahead of the matching, by default twice the
+        number of workers
+
+    Returns
+    -------
+    throughput : Throughput
+        summary of the run
+    """
+    workers = workers or os.cpu_count() or 1
+    prefetch = prefetch or 2 * workers
+    throughput = Throughput()
+    start = time.perf_counter()
+    remaining = iter(paths)
+    pending: Deque[Tuple[str, Future]] = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for path in remaining:
+            pending.append((path, _load(executor, path)))
+            if len(pending) == prefetch:
+                break
+        while pending:
+            path, future = pending.popleft()
+            # Refill the pipeline before waiting so the workers stay busy.
+            for next_path in remaining:
+                pending.append((next_path, _load(executor, next_path)))
+                break
+            waited = time.perf_counter()
+            try:
+                loaded, parse = future.result()
+                throughput.wait += time.perf_counter() - waited
+                throughput.parse += parse
+                batch = loads_orders(loaded) if isinstance(loaded, bytes) else loaded
+                matched = time.perf_counter()
+                result = run_auction(batch, engine=engine)
+                throughput.match += time.perf_counter() - matched
+                line = {"file": path, "orders": len(batch), **asdict(result)}
+                throughput.auctions += 1
+                throughput.orders += len(batch)
+            except Exception as error:
+                line = {"file": path, "error": str(error)}
+                throughput.failed += 1
+            written = time.perf_counter()
+            output.write(json.dumps(line) + "\n")
+            throughput.write += time.perf_counter() - written
+    output.flush()
+    throughput.elapsed = time.perf_counter() - start
+    return throughput
+
+
+def main(argv: Optional[List[str]] = None) -> int:
+    parser = argparse.ArgumentParser(prog="coral", description=__doc__,
+                                     formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("paths", nargs="+", help="order files, directories or glob patterns")
+    parser.add_argument("--engine", default="python", choices=["python", "numpy", "streaming", "compact"],
+                        help="engine used by run_auction")
+    parser.add_argument("--workers", type=int, help="number of parsing processes, the number of CPUs by default")
+    parser.add_argument("--prefetch", type=int, help="files parsed ahead of the matching, 2 per worker by default")
+    parser.add_argument("--output", default="-", help="NDJSON results file, stdout by default")
+    args = parser.parse_args(argv)
+
+    paths = find_order_files(args.paths)
+    if args.output == "-":
+        throughput = clear_files(paths, sys.stdout, args.engine, args.workers, args.prefetch)
+    else:
+        with open(args.output, "w") as output:
+            throughput = clear_files(paths, output, args.engine, args.workers, args.prefetch)
+    print(throughput.render(), file=sys.stderr)
+    return 1 if throughput.failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
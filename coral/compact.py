@@ -0,0 +1,217 @@
+"""
+Compacted clearing book.
+
+`AuctionOrder` only groups orders with equal price and quantity, so a book with a
+few price points and varied quantities still has about one level per order. The
+outcome of the auction only depends on the aggregated quantity at each price, so the
+compacted book merges every `AuctionOrder` with the same price into a single
+`PriceLevel` and the matcher visits one level per price.
+
+The allocation of a `PriceLevel` is handed to its `AuctionOrder`s in the order of the
+regular book, higher quantities first, so per-order fills are the same as the ones of
+an `AuctionManager`.
+"""
+from __future__ import annotations
+from dataclasses import dataclass
+from typing import List, Literal, Tuple, Union
+
+from coral.batch import OrderBatch
+from coral.core import AuctionOrder, AuctionResult, Order, group_orders
+
+
+@dataclass(slots=True)
+class PriceLevel:
+    """
+    Aggregates all the `AuctionOrder`s with the same price.
+
+    Attributes
+    ----------
+    p : float
+        the max/min price to buy/sell shares
+    order_type : Literal["BUY", "SELL"]
+        price level type
+    levels : List[AuctionOrder]
+        the aggregated `AuctionOrder`s, sorted by descending quantity
+    q_total : float
+        the number of shares of all the aggregated orders
+    allocated : float
+        the number of allocated shares for this price level
+    """
+    p: float
+    order_type: Literal['BUY', 'SELL']
+    levels: List[AuctionOrder]
+    q_total: float
+    allocated: float = 0
+
+    @property
+    def fulfilled(self) -> bool:
+        return self.allocated == self.q_total
+
+    @property
+    def q_to_allocate(self) -> float:
+        return self.q_total - self.allocated
+
+    @property
+    def orders(self) -> List[Order]:
+        """
+        The orders of every aggregated `AuctionOrder`, in the order of `levels`.
+        """
+        return [order for level in self.levels for order in level.orders]
+
+    def split_allocation(self, whole_shares: bool = False) -> List[float]:
+        """
+        Splits the allocated shares between the aggregated orders.
+
+        The shares fill the `AuctionOrder`s in order of descending quantity, the first
+        one that can't be fulfilled divides its shares pro-rata between its orders
+        (see `AuctionOrder.split_allocation`) and the rest get nothing. The allocation
+        of each `AuctionOrder` is updated along the way.
+
+        Parameters
+        ----------
+        whole_shares : bool
+            if `True` each order gets a whole number of shares, distributing the
+            remaining shares by largest remainder
+
+        Returns
+        -------
+        shares : List[float]
+            the shares allocated to each order, in the same order as `orders`
+        """
+        shares: List[float] = []
+        remaining = self.allocated
+        for level in self.levels:
+            level.allocated = level.q_total if level.q_total <= remaining else remaining
+            remaining -= level.allocated
+            shares.extend(level.split_allocation(whole_shares))
+        return shares
+
+
+def compact_levels(auction_orders: List[AuctionOrder]) -> List[PriceLevel]:
+    """
+    Merges consecutive `AuctionOrder`s with the same price into `PriceLevel`s.
+
+    Parameters
+    ----------
+    auction_orders : List[AuctionOrder]
+        buy or sell orders sorted according to the user's willingness
+
+    Returns
+    -------
+    price_levels : List[PriceLevel]
+        one price level per distinct price, in the same order
+    """
+    price_levels: List[PriceLevel] = []
+    for auction_order in auction_orders:
+        if price_levels and price_levels[-1].p == auction_order.p:
+            price_level = price_levels[-1]
+            price_level.levels.append(auction_order)
+            price_level.q_total += auction_order.q_total
+        else:
+            price_levels.append(PriceLevel(
+                p=auction_order.p,
+                order_type=auction_order.order_type,
+                levels=[auction_order],
+                q_total=auction_order.q_total
+            ))
+    return price_levels
+
+
+def compact_orders(orders: Union[List[Order], OrderBatch]) -> Tuple[List[PriceLevel], List[PriceLevel]]:
+    """
+    Groups the orders into sorted lists of buy and sell `PriceLevel`s.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders to group
+
+    Returns
+    -------
+    buy_levels, sell_levels : Tuple[List[PriceLevel], List[PriceLevel]]
+        the buy and sell price levels sorted according to the user's willingness
+    """
+    buy_orders, sell_orders = group_orders(orders)
+    return compact_levels(buy_orders), compact_levels(sell_orders)
+
+
+class CompactAuction(object):
+    """
+    Auction over a compacted book, with one `PriceLevel` per price.
+
+    The levels are matched in the same way as `clear_levels`, keeping the allocation
+    of each level so it can be split between its orders afterwards.
+
+    Attributes
+    ----------
+    buy_levels : List[PriceLevel]
+        buy price levels sorted according to the user's willingness to buy
+    sell_levels : List[PriceLevel]
+        sell price levels sorted according to the user's willingness to sell
+    """
+    buy_levels: List[PriceLevel]
+    sell_levels: List[PriceLevel]
+
+    def __init__(self, orders: Union[List[Order], OrderBatch]):
+        """
+        Constructs a CompactAuction, grouping the orders into price levels.
+
+        Parameters
+        ----------
+        orders : List[Orders] | OrderBatch
+            list of orders that take part in the auction
+        """
+        self.buy_levels, self.sell_levels = compact_orders(orders)
+
+    def clear(self) -> AuctionResult:
+        """
+        Runs the auction, allocating shares to the price levels.
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction
+        """
+        for level in self.buy_levels + self.sell_levels:
+            level.allocated = 0
+        buy_levels = iter(self.buy_levels)
+        sell_levels = iter(self.sell_levels)
+        allocated = 0
+        p_min = None
+        p_max = None
+        buy_level = next(buy_levels, None)
+        sell_level = next(sell_levels, None)
+        while True:
+            while buy_level is not None and buy_level.fulfilled:
+                buy_level = next(buy_levels, None)
+            while sell_level is not None and sell_level.fulfilled:
+                sell_level = next(sell_levels, None)
+            if buy_level is None or sell_level is None or buy_level.p < sell_level.p:
+                break
+            q_buy = buy_level.q_to_allocate
+            q_sell = sell_level.q_to_allocate
+            q = q_buy if q_buy <= q_sell else q_sell
+            allocated += q
+            buy_level.allocated += q
+            sell_level.allocated += q
+            if p_max is None:
+                p_max = buy_level.p
+            p_min = sell_level.p
+        return AuctionResult(q_max=allocated, p_min=p_min, p_max=p_max)
+
+
+def run_auction_compact(orders: Union[List[Order], OrderBatch]) -> AuctionResult:
+    """
+    Runs an auction over a compacted book.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders that take part in the auction
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    return CompactAuction(orders).clear()
@@ -0,0 +1,158 @@
+"""
+Continuous double auction.
+
+Between call auctions, every incoming `Order` is matched immediately against the
+resting orders of the opposite side, at their price. Resting orders are grouped in
+levels with equal price and quantity, ordered by the same willingness as
+`AuctionOrder.compared_to`, and the levels are kept in a heap, so the best level is
+found in O(1) and a new one is added in O(log n). Inside a level orders are matched
+first in, first out.
+"""
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from heapq import heappop, heappush
+from typing import Deque, Dict, List, Optional, Tuple
+
+from coral.core import Order, buy_priority, sell_priority
+
+Key = Tuple[float, float]
+
+
+@dataclass(slots=True)
+class Trade:
+    """
+    Shares exchanged between a buy and a sell order.
+
+    Attributes
+    ----------
+    buy_user_id : str
+        user of the buy order
+    sell_user_id : str
+        user of the sell order
+    q : float
+        number of shares exchanged
+    p : float
+        price of the shares, the price of the resting order
+    """
+    buy_user_id: str
+    sell_user_id: str
+    q: float
+    p: float
+
+
+class _Side(object):
+    # Resting orders of one side: a heap of level keys and a FIFO queue of
+    # `[order, remaining]` entries per level.
+    __slots__ = ("priority", "heap", "levels")
+
+    def __init__(self, priority):
+        self.priority = priority
+        self.heap: List[Key] = []
+        self.levels: Dict[Key, Deque[list]] = {}
+
+    def add(self, order: Order, remaining: float) -> None:
+        key = self.priority(order)
+        level = self.levels.get(key)
+        if level is None:
+            level = self.levels[key] = deque()
+            heappush(self.heap, key)
+        level.append([order, remaining])
+
+    def best(self) -> Optional[Deque[list]]:
+        # Keys of emptied levels are removed lazily.
+        heap = self.heap
+        while heap:
+            level = self.levels.get(heap[0])
+            if level is not None:
+                return level
+            heappop(heap)
+        return None
+
+    def remove_best(self) -> None:
+        del self.levels[heappop(self.heap)]
+
+
+class ContinuousAuction(object):
+    """
+    Continuous double auction matching each incoming order immediately.
+
+    Attributes
+    ----------
+    volume : float
+        total number of shares exchanged
+    """
+    volume: float
+
+    def __init__(self):
+        self._bids = _Side(buy_priority)
+        self._asks = _Side(sell_priority)
+        self.volume = 0
+
+    def best_bid(self) -> Optional[Order]:
+        """
+        Returns the resting buy order that would be matched first, or `None`.
+        """
+        level = self._bids.best()
+        return level[0][0] if level else None
+
+    def best_ask(self) -> Optional[Order]:
+        """
+        Returns the resting sell order that would be matched first, or `None`.
+        """
+        level = self._asks.best()
+        return level[0][0] if level else None
+
+    def resting(self) -> List[Tuple[Order, float]]:
+        """
+        Returns every resting order with its remaining quantity, buy orders first,
+        in matching order.
+        """
+        resting = []
+        for side in (self._bids, self._asks):
+            for key in sorted(side.levels):
+                resting += [(order, remaining) for order, remaining in side.levels[key]]
+        return resting
+
+    def submit(self, order: Order) -> List[Trade]:
+        """
+        Matches an order against the resting orders of the opposite side and keeps
+        whatever remains of it in the book.
+
+        Parameters
+        ----------
+        order : Order
+            incoming order
+
+        Returns
+        -------
+        trades : List[Trade]
+            the trades produced by the order, in execution order
+        """
+        is_buy = order.order_type == "BUY"
+        own, opposite = (self._bids, self._asks) if is_buy else (self._asks, self._bids)
+        trades = []
+        remaining = order.q
+        while remaining > 0:
+            level = opposite.best()
+            if level is None:
+                break
+            entry = level[0]
+            resting = entry[0]
+            if (order.p < resting.p) if is_buy else (order.p > resting.p):
+                break
+            q = remaining if remaining <= entry[1] else entry[1]
+            remaining -= q
+            entry[1] -= q
+            self.volume += q
+            if is_buy:
+                trades.append(Trade(buy_user_id=order.user_id, sell_user_id=resting.user_id, q=q, p=resting.p))
+            else:
+                trades.append(Trade(buy_user_id=resting.user_id, sell_user_id=order.user_id, q=q, p=resting.p))
+            if entry[1] <= 0:
+                level.popleft()
+                if not level:
+                    opposite.remove_best()
+        if remaining > 0:
+            own.add(order, remaining)
+        return trades
@@ -1,9 +1,19 @@
 from __future__ import annotations
+import math
+import time
 from dataclasses import dataclass
-from typing import List, Literal, Union, Callable
+from typing import TYPE_CHECKING, Dict, Iterable, List, Literal, Optional, Tuple, Union, Callable
 
+from coral.metrics import AuctionMetrics, MetricsSink
 
-@dataclass
+if TYPE_CHECKING:
+    from coral.batch import OrderBatch
+    from coral.cache import AuctionCache
+    from coral.ticks import TickScale
+    from coral.trace import MatchTrace
+
+
+@dataclass(slots=True)
 class Order:
     """
     Represents an order entered by a user. It specifies the number of
@@ -26,7 +36,7 @@ class Order:
     p: float
 
 
-@dataclass
+@dataclass(slots=True)
 class AuctionResult:
     """
     Holds the result of running an auction.
@@ -45,7 +55,7 @@ class AuctionResult:
     p_max: Union[float, None]
 
 
-@dataclass
+@dataclass(slots=True)
 class AuctionOrder(object):
     """
     Aggregates multiple Orders with the same price and quantity and handles share
@@ -105,6 +115,182 @@ class AuctionOrder(object):
                 else:
                     return 1 if self.q > other.q else -1
 
+    def split_allocation(self, whole_shares: bool = False) -> List[float]:
+        """
+        Splits the allocated shares between the aggregated orders.
+
+        A fulfilled `AuctionOrder` gives each order its whole quantity. Otherwise the
+        allocated shares are divided pro-rata to the quantity of each order.
+
+        Parameters
+        ----------
+        whole_shares : bool
+            if `True` each order gets a whole number of shares, distributing the
+            remaining shares by largest remainder
+
+        Returns
+        -------
+        shares : List[float]
+            the shares allocated to each order, in the same order as `orders`
+        """
+        if self.fulfilled:
+            return [order.q for order in self.orders]
+        return pro_rata(self.allocated, [order.q for order in self.orders], whole_shares)
+
+
+def pro_rata(total: float, weights: List[float], whole_shares: bool = False) -> List[float]:
+    """
+    Splits a number of shares proportionally to a list of weights.
+
+    When `whole_shares` is set, every share is first rounded down and the remaining
+    shares are handed out one by one by largest remainder. Equal remainders are
+    resolved by position, so the result is deterministic.
+
+    Parameters
+    ----------
+    total : float
+        number of shares to split
+    weights : List[float]
+        weight of each participant
+    whole_shares : bool
+        if `True` only whole shares are allocated
+
+    Returns
+    -------
+    shares : List[float]
+        the shares allocated to each participant
+    """
+    weight_total = sum(weights)
+    if total == 0 or weight_total == 0:
+        return [0] * len(weights)
+    shares = [total * weight / weight_total for weight in weights]
+    if not whole_shares:
+        return shares
+    floors = [math.floor(share) for share in shares]
+    remaining = math.floor(total) - sum(floors)
+    by_remainder = sorted(range(len(shares)), key=lambda index: floors[index] - shares[index])
+    for index in by_remainder[:remaining]:
+        floors[index] += 1
+    return floors
+
+
+def buy_priority(auction_order: Union[Order, AuctionOrder]) -> Tuple[float, float]:
+    """
+    Sort key that places the buy orders most willing to buy first.
+
+    Higher prices go first and, for equal prices, higher quantities go first. It
+    yields the same ordering as `AuctionOrder.compared_to`.
+    """
+    return (-auction_order.p, -auction_order.q)
+
+
+def sell_priority(auction_order: Union[Order, AuctionOrder]) -> Tuple[float, float]:
+    """
+    Sort key that places the sell orders most willing to sell first.
+
+    Lower prices go first and, for equal prices, higher quantities go first. It
+    yields the same ordering as `AuctionOrder.compared_to`.
+    """
+    return (auction_order.p, -auction_order.q)
+
+
+def group_orders(orders: Iterable[Order]) -> Tuple[List[AuctionOrder], List[AuctionOrder]]:
+    """
+    Groups the orders into sorted lists of buy and sell `AuctionOrder`s.
+
+    Orders with equal price and quantity are merged into a single `AuctionOrder`
+    with a hash map, keeping their original order, and each side is sorted once
+    afterwards, so the whole book is built in O(n log n).
+
+    Parameters
+    ----------
+    orders : Iterable[Order]
+        list of orders to group
+
+    Returns
+    -------
+    buy_orders, sell_orders : Tuple[List[AuctionOrder], List[AuctionOrder]]
+        the buy and sell orders sorted according to the user's willingness
+    """
+    buy_orders, sell_orders = aggregate_orders(orders)
+    return sort_orders(buy_orders, sell_orders)
+
+
+def aggregate_orders(orders: Iterable[Order]) -> Tuple[List[AuctionOrder], List[AuctionOrder]]:
+    """
+    Merges the orders with equal price and quantity into `AuctionOrder`s, keeping their
+    original order. It is the first half of `group_orders`: the returned `AuctionOrder`s
+    are not sorted.
+
+    Parameters
+    ----------
+    orders : Iterable[Order]
+        list of orders to group
+
+    Returns
+    -------
+    buy_orders, sell_orders : Tuple[List[AuctionOrder], List[AuctionOrder]]
+        the unsorted buy and sell orders
+    """
+    buy_levels: Dict[Tuple[float, float], AuctionOrder] = {}
+    sell_levels: Dict[Tuple[float, float], AuctionOrder] = {}
+    for order in orders:
+        if order.order_type == "BUY":
+            levels, order_type = buy_levels, "BUY"
+        else:
+            levels, order_type = sell_levels, "SELL"
+        key = (order.p, order.q)
+        auction_order = levels.get(key)
+        if auction_order is None:
+            levels[key] = AuctionOrder(
+                orders=[order],
+                p=order.p,
+                q=order.q,
+                order_type=order_type
+            )
+        else:
+            auction_order.orders.append(order)
+    return list(buy_levels.values()), list(sell_levels.values())
+
+
+def sort_orders(buy_orders: List[AuctionOrder],
+                sell_orders: List[AuctionOrder]) -> Tuple[List[AuctionOrder], List[AuctionOrder]]:
+    """
+    Sorts the buy and sell `AuctionOrder`s according to the user's willingness. It is
+    the second half of `group_orders`.
+    """
+    return sorted(buy_orders, key=buy_priority), sorted(sell_orders, key=sell_priority)
+
+
+def bisect_levels(auction_orders: List[AuctionOrder], order: Order) -> int:
+    """
+    Finds the position of an order inside a sorted list of `AuctionOrder`s.
+
+    Returns the index of the first `AuctionOrder` that is not more willing than the
+    order. If that `AuctionOrder` compares equal the order belongs to it, otherwise
+    the order should be inserted at that index.
+
+    Parameters
+    ----------
+    auction_orders : List[AuctionOrder]
+        buy or sell orders sorted according to the user's willingness
+    order : Order
+        order to locate
+
+    Returns
+    -------
+    index : int
+        position of the order inside `auction_orders`
+    """
+    lo, hi = 0, len(auction_orders)
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if auction_orders[mid].compared_to(order) == 1:
+            lo = mid + 1
+        else:
+            hi = mid
+    return lo
+
 
 class AuctionManager(object):
     """
@@ -129,6 +315,10 @@ class AuctionManager(object):
         internal index pointing to the last evaluated "BUY" order
     sell_index : int
         internal index pointing to the last evaluated "SELL" order
+    metrics : AuctionMetrics | None
+        metrics of the auction, only measured when a `metrics_sink` is provided
+    trace : MatchTrace | None
+        trace that records every matching step, if any
 
     """
     buy_orders: List[AuctionOrder]
@@ -138,30 +328,51 @@ class AuctionManager(object):
     p_max: float = None
     buy_index: int = 0
     sell_index: int = 0
+    metrics: Optional[AuctionMetrics] = None
+    metrics_sink: Optional[MetricsSink] = None
+    trace: Optional[MatchTrace] = None
 
-    def __init__(self, orders: List[Order]):
+    def __init__(self, orders: Union[List[Order], OrderBatch], metrics_sink: Optional[MetricsSink] = None,
+                 trace: Optional[MatchTrace] = None):
         """
         Constructs an AuctionManger according to the provided orders.
 
         All the orders will be sorted into the `buy_orders` and `sell_orders`. For each order
         an equivalent `AuctionOrder` will be created, grouping those orders with equal properties.
+        The book is built in bulk by `group_orders`, so construction takes O(n log n).
 
         Parameters
         ----------
-        orders : List[Orders]
+        orders : List[Orders] | OrderBatch
             list of orders that the class should handle
+        metrics_sink : MetricsSink | None
+            callable that receives the `AuctionMetrics` of the auction once the orders are
+            allocated. When it is `None` no metrics are measured
+        trace : MatchTrace | None
+            ring buffer that records every matching step (see `coral.trace`). When it
+            is `None` nothing is recorded
 
         Returns
         -------
         None
         """
-        self.buy_orders = []
-        self.sell_orders = []
-        for order in orders:
-            if order.order_type == "BUY":
-                self.append_to_buy_orders(order)
-            else:
-                self.append_to_sell_orders(order)
+        if trace is not None:
+            self.trace = trace
+        if metrics_sink is None:
+            self.buy_orders, self.sell_orders = group_orders(orders)
+            return
+        self.metrics_sink = metrics_sink
+        self.metrics = metrics = AuctionMetrics()
+        start = time.perf_counter()
+        buy_orders, sell_orders = aggregate_orders(orders)
+        grouped = time.perf_counter()
+        self.buy_orders, self.sell_orders = sort_orders(buy_orders, sell_orders)
+        metrics.sorting = time.perf_counter() - grouped
+        metrics.grouping = grouped - start
+        metrics.levels_created = len(buy_orders) + len(sell_orders)
+        metrics.orders = sum(len(auction_order.orders) for auction_order in buy_orders) + sum(
+            len(auction_order.orders) for auction_order in sell_orders)
+        metrics.orders_merged = metrics.orders - metrics.levels_created
 
     def next_buy_order(self) -> Union[AuctionOrder, None]:
         """
@@ -172,14 +383,13 @@ class AuctionManager(object):
         buy_order : AuctionOrder | None
             The next unallocated buy order or `None`
         """
-        try:
-            buy_order = self.buy_orders[self.buy_index]
-            if buy_order.fulfilled:
-                self.buy_index += 1
-                return self.next_buy_order()
-            return buy_order
-        except IndexError:
-            return None
+        buy_orders = self.buy_orders
+        while self.buy_index < len(buy_orders):
+            buy_order = buy_orders[self.buy_index]
+            if not buy_order.fulfilled:
+                return buy_order
+            self.buy_index += 1
+        return None
 
     def next_sell_order(self) -> Union[AuctionOrder, None]:
         """
@@ -190,14 +400,13 @@ class AuctionManager(object):
         sell_order : AuctionOrder | None
             The next unallocated sell order or `None`
         """
-        try:
-            sell_order = self.sell_orders[self.sell_index]
-            if sell_order.fulfilled:
-                self.sell_index += 1
-                return self.next_sell_order()
-            return sell_order
-        except IndexError:
-            return None
+        sell_orders = self.sell_orders
+        while self.sell_index < len(sell_orders):
+            sell_order = sell_orders[self.sell_index]
+            if not sell_order.fulfilled:
+                return sell_order
+            self.sell_index += 1
+        return None
 
     def match_orders(self, buy_order: AuctionOrder, sell_order: AuctionOrder) -> bool:
         """
@@ -238,22 +447,58 @@ class AuctionManager(object):
         """
         Runs the auction with the current buy/sell orders.
 
+        The buy and sell orders are walked with two pointers (`buy_index` and
+        `sell_index`) in a single loop, so the stack depth doesn't depend on the
+        number of orders.
+
         Returns
         -------
         None
         """
-        buy_order = self.next_buy_order()
-        sell_order = self.next_sell_order()
-        if buy_order == None or sell_order == None:
+        if self.metrics is not None or self.trace is not None:
+            return self._allocate_orders_instrumented()
+        while True:
+            buy_order = self.next_buy_order()
+            sell_order = self.next_sell_order()
+            if buy_order is None or sell_order is None:
+                return
+            # If an order can't be allocated we stop the process.
+            if not self.match_orders(buy_order, sell_order):
+                return
+
+    def _allocate_orders_instrumented(self) -> None:
+        metrics = self.metrics
+        trace = self.trace
+        start = time.perf_counter()
+        first_index = self.buy_index + self.sell_index
+        iterations = 0
+        while True:
+            buy_order = self.next_buy_order()
+            sell_order = self.next_sell_order()
+            if buy_order is None or sell_order is None:
+                break
+            allocated = self.allocated
+            if not self.match_orders(buy_order, sell_order):
+                break
+            iterations += 1
+            if trace is not None:
+                trace.record(self.buy_index, self.sell_index, buy_order.p, sell_order.p,
+                             self.allocated - allocated, self.p_min, self.p_max)
+        if metrics is None:
             return
-        # If an order can't be allocated we stop the process.
-        if self.match_orders(buy_order, sell_order):
-            self.allocate_orders()
+        metrics.matching += time.perf_counter() - start
+        metrics.match_iterations += iterations
+        # Every walked level moves one of the indexes, except the ones it stops at.
+        metrics.levels_visited += self.buy_index + self.sell_index - first_index + (
+            buy_order is not None) + (sell_order is not None)
+        self.metrics_sink(metrics)
 
     def append_to_buy_orders(self, buy_order: Order) -> None:
         """
         Adds an order to the `buy_orders` list, sorted according to the user's willingness to buy.
 
+        The insertion point is found with a binary search over `buy_orders`.
+
         Parameters
         ----------
         buy_order : AuctionOrder
@@ -263,21 +508,11 @@ class AuctionManager(object):
         -------
         None
         """
-        for index, auction_order in enumerate(self.buy_orders):
-            more_willing = auction_order.compared_to(
-                buy_order)
-            if more_willing == -1:
-                self.buy_orders.insert(index, AuctionOrder(
-                    orders=[buy_order],
-                    p=buy_order.p,
-                    q=buy_order.q,
-                    order_type="BUY"
-                ))
-                return
-            elif more_willing == 0:
-                self.buy_orders[index].orders.append(buy_order)
-                return
-        self.buy_orders.append(AuctionOrder(
+        index = bisect_levels(self.buy_orders, buy_order)
+        if index < len(self.buy_orders) and self.buy_orders[index].compared_to(buy_order) == 0:
+            self.buy_orders[index].orders.append(buy_order)
+            return
+        self.buy_orders.insert(index, AuctionOrder(
             orders=[buy_order],
             p=buy_order.p,
             q=buy_order.q,
@@ -288,6 +523,8 @@ class AuctionManager(object):
         """
         Adds an order to the `sell_orders` list, sorted according to the user's willingness to sell.
 
+        The insertion point is found with a binary search over `sell_orders`.
+
         Parameters
         ----------
         sell_order : AuctionOrder
@@ -297,21 +534,11 @@ class AuctionManager(object):
         -------
         None
         """
-        for index, auction_order in enumerate(self.sell_orders):
-            more_willing = auction_order.compared_to(
-                sell_order)
-            if more_willing == -1:
-                self.sell_orders.insert(index, AuctionOrder(
-                    orders=[sell_order],
-                    p=sell_order.p,
-                    q=sell_order.q,
-                    order_type="SELL"
-                ))
-                return
-            elif more_willing == 0:
-                self.sell_orders[index].orders.append(sell_order)
-                return
-        self.sell_orders.append(AuctionOrder(
+        index = bisect_levels(self.sell_orders, sell_order)
+        if index < len(self.sell_orders) and self.sell_orders[index].compared_to(sell_order) == 0:
+            self.sell_orders[index].orders.append(sell_order)
+            return
+        self.sell_orders.insert(index, AuctionOrder(
             orders=[sell_order],
             p=sell_order.p,
             q=sell_order.q,
@@ -319,7 +546,121 @@ class AuctionManager(object):
         ))
 
 
-def run_auction(orders: List[Order]) -> AuctionResult:
-    manager = AuctionManager(orders)
+def run_auction(orders: Union[List[Order], OrderBatch, Iterable[Order], str],
+                engine: Literal['python', 'numpy', 'streaming', 'compact'] = "python",
+                metrics_sink: Optional[MetricsSink] = None,
+                cache: Optional[AuctionCache] = None,
+                scale: Optional[TickScale] = None,
+                trace: Optional[MatchTrace] = None) -> AuctionResult:
+    """
+    Runs an auction over the provided orders.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch | Iterable[Order] | str
+        list of orders that take part in the auction. The "streaming" engine also
+        accepts a generator or the path of an NDJSON/CSV order file
+    engine : Literal["python", "numpy", "streaming", "compact"]
+        "python" runs the auction through an `AuctionManager`, "numpy" clears it from
+        columnar arrays with `coral.vectorized` (requires numpy), "streaming"
+        aggregates the orders on the fly with `coral.streaming`, holding only the
+        distinct price/quantity levels in memory, and "compact" matches one level per
+        price with `coral.compact`
+    metrics_sink : MetricsSink | None
+        callable that receives the `AuctionMetrics` of the auction (see `coral.metrics`).
+        Only supported by the "python" engine
+    cache : AuctionCache | None
+        cache of results (see `coral.cache`). When the same multiset of orders has
+        already been cleared its result is returned without running the auction.
+        Only lists of orders and `OrderBatch`es can be cached
+    scale : TickScale | None
+        when provided, prices and quantities are converted to integer ticks and lots
+        (see `coral.ticks`), so the auction runs on exact integers and only the
+        result is converted back to floats
+    trace : MatchTrace | None
+        ring buffer that records every matching step of the auction (see
+        `coral.trace`). Only supported by the "python" engine
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    if scale is not None:
+        return scale.unscale_result(run_auction(scale.scale_orders(orders), engine, metrics_sink, cache, trace=trace))
+    if cache is not None:
+        key = cache.key(orders)
+        result = cache.get(key)
+        if result is None:
+            result = run_auction(orders, engine, metrics_sink, trace=trace)
+            cache.put(key, result)
+        return result
+    if metrics_sink is not None and engine != "python":
+        raise ValueError(f"the {engine} engine doesn't support metrics")
+    if trace is not None and engine != "python":
+        raise ValueError(f"the {engine} engine doesn't support tracing")
+    if engine == "numpy":
+        from coral.vectorized import run_auction_numpy
+        return run_auction_numpy(orders)
+    if engine == "streaming":
+        from coral.streaming import run_auction_stream
+        return run_auction_stream(orders)
+    if engine == "compact":
+        from coral.compact import run_auction_compact
+        return run_auction_compact(orders)
+    if engine != "python":
+        raise ValueError(f"unknown auction engine: {engine}")
+    manager = AuctionManager(orders, metrics_sink, trace)
     manager.allocate_orders()
     return AuctionResult(q_max=manager.allocated, p_max=manager.p_max, p_min=manager.p_min)
+
+
+def clear_levels(buy_levels: Iterable[Tuple[float, float]],
+                 sell_levels: Iterable[Tuple[float, float]]) -> AuctionResult:
+    """
+    Runs the matching of `AuctionManager.allocate_orders` over aggregated levels.
+
+    Each level is a `(p, q_total)` pair, given in the same order as `buy_orders` and
+    `sell_orders`. The allocations are tracked in local variables, so the levels are
+    never mutated and are only consumed as far as the matching goes.
+
+    Parameters
+    ----------
+    buy_levels : Iterable[Tuple[float, float]]
+        buy levels sorted according to the user's willingness to buy
+    sell_levels : Iterable[Tuple[float, float]]
+        sell levels sorted according to the user's willingness to sell
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    buy_levels = iter(buy_levels)
+    sell_levels = iter(sell_levels)
+    allocated = 0
+    p_min = None
+    p_max = None
+    buy_p, buy_total = next(buy_levels, (None, None))
+    sell_p, sell_total = next(sell_levels, (None, None))
+    buy_allocated = 0
+    sell_allocated = 0
+    while True:
+        while buy_p is not None and buy_allocated == buy_total:
+            buy_p, buy_total = next(buy_levels, (None, None))
+            buy_allocated = 0
+        while sell_p is not None and sell_allocated == sell_total:
+            sell_p, sell_total = next(sell_levels, (None, None))
+            sell_allocated = 0
+        if buy_p is None or sell_p is None or buy_p < sell_p:
+            break
+        q_buy = buy_total - buy_allocated
+        q_sell = sell_total - sell_allocated
+        q = q_buy if q_buy <= q_sell else q_sell
+        allocated += q
+        buy_allocated += q
+        sell_allocated += q
+        if p_max is None:
+            p_max = buy_p
+        p_min = sell_p
+    return AuctionResult(q_max=allocated, p_min=p_min, p_max=p_max)
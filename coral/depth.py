@@ -0,0 +1,356 @@
+"""
+Depth index for what-if clearing queries.
+
+The matching of `AuctionManager.allocate_orders` fills the buy levels, from the most
+to the least willing, against the sell levels in the same way. While the `i`-th buy
+level is being filled, it can only be matched against the sell orders with a price
+lower than or equal to its own, so the number of shares exchanged is
+
+    q_max = max(min(D[i], E[i]) for every buy level i)
+
+where `D[i]` is the cumulative quantity of the buy levels up to `i` and `E[i]` the
+cumulative quantity of the sell levels whose price is at most the price of `i`.
+`min(D[i], E[i])` grows with `D` and shrinks with `E`, so after adding or removing
+an order, or scaling a side, only a single crossing has to be located with a binary
+search.
+
+Integer quantities, including the ones of `coral.ticks`, are summed and compared
+exactly. Fractional prefix sums carry rounding errors, so a cumulative quantity is
+considered to reach the matched quantity when it is within a bound of those errors:
+one `math.ulp` of the largest sum per summed quantity.
+"""
+from __future__ import annotations
+import math
+from bisect import bisect_left, bisect_right
+from itertools import accumulate
+from numbers import Integral
+from typing import Callable, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from coral.core import AuctionManager, AuctionOrder, AuctionResult, Order, group_orders
+
+# Largest float up to which every integer is represented exactly.
+MAX_EXACT = 2 ** 53
+
+
+def levels(auction_orders: Iterable[AuctionOrder]) -> List[Tuple[float, float, int]]:
+    """
+    Returns the `(p, q_total, orders)` levels of sorted `AuctionOrder`s, as indexed by
+    `DepthIndex`.
+    """
+    return [(auction_order.p, auction_order.q_total, len(auction_order.orders)) for auction_order in auction_orders]
+
+
+def _first(lo: int, hi: int, predicate: Callable[[int], bool]) -> int:
+    # First index in [lo, hi) for which a monotone predicate holds, or `hi`.
+    while lo < hi:
+        mid = (lo + hi) // 2
+        if predicate(mid):
+            hi = mid
+        else:
+            lo = mid + 1
+    return lo
+
+
+def _removed_before(removed: Dict[int, Tuple[float, int]], quantities: List[float],
+                    counts: List[int]) -> Callable[[int], float]:
+    # Quantity removed from the levels up to an index. When every order of a level is
+    # removed its quantity is subtracted as is, so the prefix sums of emptied levels
+    # cancel out exactly.
+    levels = sorted(removed)
+    cumulative = list(accumulate(
+        quantities[level] if removed[level][1] == counts[level] else removed[level][0]
+        for level in levels))
+
+    def before(index: int) -> float:
+        k = bisect_right(levels, index)
+        return cumulative[k - 1] if k else 0
+    return before
+
+
+def _peak(lo: int, hi: int, rising: Callable[[int], float], falling: Callable[[int], float]) -> float:
+    # max(min(rising(i), falling(i)) for i in [lo, hi)), found at the crossing of a
+    # non-decreasing and a non-increasing sequence.
+    crossing = _first(lo, hi, lambda i: rising(i) >= falling(i))
+    return max(falling(crossing) if crossing < hi else 0, rising(crossing - 1) if crossing > lo else 0)
+
+
+class DepthIndex(object):
+    """
+    Read-only index over the cumulative quantities of a book.
+
+    The index is built once, in O(n log n), and answers each what-if query in
+    O(log n) without modifying it. The answers are computed from prefix sums, so with
+    fractional quantities `q_max` may differ from `run_auction` by rounding errors,
+    while the prices are the ones of exact arithmetic as long as no level holds fewer
+    shares than those errors. Books that need exact answers can be indexed in ticks
+    and lots (see `coral.ticks`).
+
+    Attributes
+    ----------
+    buy_prices : List[float]
+        price of each buy level, sorted according to the user's willingness to buy
+    buy_depth : List[float]
+        cumulative quantity of the buy levels
+    sell_prices : List[float]
+        price of each sell level, sorted according to the user's willingness to sell
+    sell_depth : List[float]
+        cumulative quantity of the sell levels
+    """
+    buy_prices: List[float]
+    buy_depth: List[float]
+    sell_prices: List[float]
+    sell_depth: List[float]
+
+    def __init__(self, buy_levels: Iterable[Tuple[float, float, int]],
+                 sell_levels: Iterable[Tuple[float, float, int]]):
+        """
+        Constructs a DepthIndex from `(p, q_total, orders)` levels sorted as
+        `buy_orders` and `sell_orders`, `orders` being the number of orders of the
+        level. Empty levels are ignored.
+
+        Parameters
+        ----------
+        buy_levels : Iterable[Tuple[float, float, int]]
+            buy levels sorted according to the user's willingness to buy
+        sell_levels : Iterable[Tuple[float, float, int]]
+            sell levels sorted according to the user's willingness to sell
+        """
+        buy_levels = [level for level in buy_levels if level[1]]
+        sell_levels = [level for level in sell_levels if level[1]]
+        self.buy_prices = [p for p, _, _ in buy_levels]
+        self._buy_quantities = [q for _, q, _ in buy_levels]
+        self._buy_counts = [n for _, _, n in buy_levels]
+        self.buy_depth = list(accumulate(self._buy_quantities))
+        self.sell_prices = [p for p, _, _ in sell_levels]
+        self._sell_quantities = [q for _, q, _ in sell_levels]
+        self._sell_counts = [n for _, _, n in sell_levels]
+        self.sell_depth = list(accumulate(self._sell_quantities))
+        quantities = self._buy_quantities + self._sell_quantities
+        self._total = max(self.buy_depth[-1:] + self.sell_depth[-1:], default=0)
+        self._integers = all(isinstance(q, Integral) for q in quantities)
+        self._integral = self._integers or all(float(q).is_integer() for q in quantities)
+        self._negated_buy_prices = [-p for p in self.buy_prices]
+        # Number of sell levels, and their quantity, available at the price of each
+        # buy level.
+        self._supply_levels = [bisect_right(self.sell_prices, p) for p in self.buy_prices]
+        self._supply = [self.sell_depth[j - 1] if j else 0 for j in self._supply_levels]
+        matched = [min(d, e) for d, e in zip(self.buy_depth, self._supply)]
+        self._prefix_max = [0] + list(accumulate(matched, max))
+        self._suffix_max = list(accumulate(reversed(matched), max))[::-1] + [0]
+
+    @classmethod
+    def from_manager(cls, manager: AuctionManager) -> DepthIndex:
+        """
+        Builds the index over the levels of an `AuctionManager`.
+        """
+        return cls(levels(manager.buy_orders), levels(manager.sell_orders))
+
+    @classmethod
+    def from_orders(cls, orders: Iterable[Order]) -> DepthIndex:
+        """
+        Builds the index over a list of orders.
+        """
+        buy_orders, sell_orders = group_orders(orders)
+        return cls(levels(buy_orders), levels(sell_orders))
+
+    def supply(self, p: float) -> float:
+        """
+        Returns the quantity of the sell orders with a price lower than or equal to `p`.
+        """
+        index = bisect_right(self.sell_prices, p)
+        return self.sell_depth[index - 1] if index else 0
+
+    def _result(self, q_max: float, p_max: float, p_min: float) -> AuctionResult:
+        if q_max <= 0:
+            return AuctionResult(q_max=0, p_min=None, p_max=None)
+        return AuctionResult(q_max=q_max, p_min=p_min, p_max=p_max)
+
+    def _tolerance(self, total: float, extra: Sequence[float] = ()) -> float:
+        # Bound on the rounding errors of the sums compared by a query that combines
+        # the `extra` values with the quantities of the book, sums being at most
+        # `total`. Integers are summed exactly, integral floats up to `MAX_EXACT`.
+        integers = self._integers and all(isinstance(value, Integral) for value in extra)
+        integral = self._integral and all(float(value).is_integer() for value in extra)
+        if integers or (integral and total <= MAX_EXACT):
+            return 0
+        return (len(self.buy_depth) + len(self.sell_depth) + len(extra)) * math.ulp(total)
+
+    def _sell_price(self, q: float, tolerance: float, lo: int = 0,
+                    key: Optional[Callable[[float], float]] = None) -> float:
+        # Price of the first sell level, from `lo`, at which `q` shares have been sold,
+        # up to `tolerance`. Queries that change the depth pass the change as `key`
+        # instead of undoing it on `q`, so the levels are compared with the same sums
+        # the matched quantity was computed from.
+        index = bisect_left(self.sell_depth, q - tolerance, lo, key=key)
+        return self.sell_prices[min(index, len(self.sell_prices) - 1)]
+
+    def result(self) -> AuctionResult:
+        """
+        Returns the result of the auction over the indexed book.
+        """
+        q_max = self._prefix_max[-1]
+        if q_max <= 0:
+            return self._result(0, None, None)
+        return self._result(q_max, self.buy_prices[0], self._sell_price(q_max, self._tolerance(self._total)))
+
+    def what_if(self, order: Order) -> AuctionResult:
+        """
+        Returns the result of the auction if an order was added to the book.
+
+        Parameters
+        ----------
+        order : Order
+            hypothetical order
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction including the order
+        """
+        if order.q <= 0:
+            return self.result()
+        q, p = order.q, order.p
+        tolerance = self._tolerance(self._total + q, (q,))
+        buy_depth = self.buy_depth
+        supply = self._supply
+        # Buy levels at least as willing as `p` come before it.
+        k = bisect_right(self._negated_buy_prices, -p)
+        if order.order_type == "BUY":
+            start = buy_depth[k - 1] if k else 0
+            q_max = max(
+                self._prefix_max[k],
+                min(start + q, self.supply(p)),
+                _peak(k, len(buy_depth), lambda i: buy_depth[i] + q, supply.__getitem__),
+            )
+            if q_max <= 0:
+                return self._result(0, None, None)
+            p_max = p if not self.buy_prices or p > self.buy_prices[0] else self.buy_prices[0]
+            return self._result(q_max, p_max, self._sell_price(q_max, tolerance))
+
+        # The sell order is available to the buy levels with a price of at least `p`.
+        q_max = max(
+            self._suffix_max[k],
+            _peak(0, k, buy_depth.__getitem__, lambda i: supply[i] + q),
+        )
+        if q_max <= 0:
+            return self._result(0, None, None)
+        # The order is sold after the sell levels with a price of at most `p`.
+        s = bisect_right(self.sell_prices, p)
+        before = self.sell_depth[s - 1] if s else 0
+        if q_max - tolerance <= before:
+            p_min = self._sell_price(q_max, tolerance)
+        elif q_max - tolerance <= before + q:
+            p_min = p
+        else:
+            p_min = self._sell_price(q_max, tolerance, s, lambda depth: depth + q)
+        return self._result(q_max, self.buy_prices[0], p_min)
+
+    def what_if_many(self, orders: Iterable[Order]) -> List[AuctionResult]:
+        """
+        Answers `what_if` for each of a batch of hypothetical orders, independently.
+        """
+        return [self.what_if(order) for order in orders]
+
+    def without(self, order_type: str, level: int, q: float) -> AuctionResult:
+        """
+        Returns the result of the auction if an order of `q` shares was removed from a
+        level, for example because it was cancelled.
+
+        Parameters
+        ----------
+        order_type : str
+            side of the level, "BUY" or "SELL"
+        level : int
+            position of the level in `buy_prices`/`sell_prices`
+        q : float
+            number of shares of the order
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction without those shares
+        """
+        return self.without_many([(order_type, level, q)])
+
+    def without_many(self, removals: Iterable[Tuple[str, int, float]]) -> AuctionResult:
+        """
+        Returns the result of the auction if orders were removed from several levels,
+        for example because every order of a user was cancelled. A level is emptied
+        when as many orders as it holds are removed from it.
+
+        The removed quantities are subtracted from the prefix sums while the index is
+        searched, so `m` removals are answered in O(m log m + log n log m) without
+        indexing the book again.
+
+        Parameters
+        ----------
+        removals : Iterable[Tuple[str, int, float]]
+            `(order_type, level, q)` removals of an order of `q` shares from the level
+            at position `level` of `buy_prices`/`sell_prices`, at most as many per
+            level as the level holds
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction without those shares
+        """
+        buy_removed: Dict[int, Tuple[float, int]] = {}
+        sell_removed: Dict[int, Tuple[float, int]] = {}
+        quantities = []
+        for order_type, level, q in removals:
+            removed = buy_removed if order_type == "BUY" else sell_removed
+            shares, count = removed.get(level, (0, 0))
+            removed[level] = (shares + q, count + 1)
+            quantities.append(q)
+        buy_before = _removed_before(buy_removed, self._buy_quantities, self._buy_counts)
+        sell_before = _removed_before(sell_removed, self._sell_quantities, self._sell_counts)
+        buy_depth = self.buy_depth
+        sell_depth = self.sell_depth
+        supply_levels = self._supply_levels
+
+        def demand(i: int) -> float:
+            return buy_depth[i] - buy_before(i)
+
+        def supply(i: int) -> float:
+            j = supply_levels[i] - 1
+            return sell_depth[j] - sell_before(j) if j >= 0 else 0
+
+        q_max = _peak(0, len(buy_depth), demand, supply)
+        if q_max <= 0:
+            return self._result(0, None, None)
+        # Emptied levels at the top of the book don't set the price.
+        p_max = self.buy_prices[_first(0, len(buy_depth), lambda i: demand(i) > 0)]
+        reached = q_max - self._tolerance(self._total, quantities)
+        index = _first(0, len(sell_depth), lambda j: sell_depth[j] - sell_before(j) >= reached)
+        return self._result(q_max, p_max, self.sell_prices[min(index, len(sell_depth) - 1)])
+
+    def scaled(self, order_type: str, factor: float) -> AuctionResult:
+        """
+        Returns the result of the auction if the quantity of every order of a side was
+        multiplied by a factor.
+
+        Parameters
+        ----------
+        order_type : str
+            side to scale, "BUY" or "SELL"
+        factor : float
+            non-negative factor applied to the quantities
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction with the scaled side
+        """
+        buy_depth = self.buy_depth
+        supply = self._supply
+        tolerance = self._tolerance(self._total * max(factor, 1), (factor,))
+        if order_type == "BUY":
+            q_max = _peak(0, len(buy_depth), lambda i: buy_depth[i] * factor, supply.__getitem__)
+            if q_max <= 0:
+                return self._result(0, None, None)
+            return self._result(q_max, self.buy_prices[0], self._sell_price(q_max, tolerance))
+        q_max = _peak(0, len(buy_depth), buy_depth.__getitem__, lambda i: supply[i] * factor)
+        if q_max <= 0:
+            return self._result(0, None, None)
+        return self._result(q_max, self.buy_prices[0],
+                            self._sell_price(q_max, tolerance, key=lambda depth: depth * factor))
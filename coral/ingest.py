@@ -0,0 +1,132 @@
+"""
+Concurrent order ingestion for the call phase.
+
+Many threads can submit orders to a `ConcurrentOrderCollector` at the same time.
+Every thread aggregates its orders into its own price/quantity levels, guarded by
+its own lock, so submissions from different threads never wait for each other. At
+clearing time the per-thread levels are merged into the `buy_orders`/`sell_orders`
+that `AuctionManager` would build from the orders in arrival order.
+"""
+from __future__ import annotations
+import threading
+from itertools import count
+from typing import Dict, Iterable, List, Tuple
+
+from coral.core import AuctionManager, AuctionOrder, Order, sort_orders
+
+Entry = Tuple[int, Order]
+
+
+class _Bucket(object):
+    __slots__ = ("lock", "buy_levels", "sell_levels", "orders")
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.buy_levels: Dict[Tuple[float, float], List[Entry]] = {}
+        self.sell_levels: Dict[Tuple[float, float], List[Entry]] = {}
+        self.orders = 0
+
+
+class ConcurrentOrderCollector(object):
+    """
+    Thread-safe collector of the orders of a call auction.
+
+    Orders are numbered on arrival with a shared counter, which is atomic under the
+    GIL, so the merged book keeps the arrival order inside each `AuctionOrder`.
+    """
+
+    def __init__(self):
+        self._sequence = count()
+        self._local = threading.local()
+        self._buckets: List[_Bucket] = []
+        self._buckets_lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return sum(bucket.orders for bucket in self._buckets)
+
+    def _bucket(self) -> _Bucket:
+        bucket = getattr(self._local, "bucket", None)
+        if bucket is None:
+            bucket = self._local.bucket = _Bucket()
+            with self._buckets_lock:
+                self._buckets.append(bucket)
+        return bucket
+
+    def submit(self, order: Order) -> int:
+        """
+        Adds an order to the auction. It can be called from any thread.
+
+        Returns
+        -------
+        sequence : int
+            arrival number of the order, which sets its position inside its `AuctionOrder`
+        """
+        return self.submit_many((order,))[0]
+
+    def submit_many(self, orders: Iterable[Order]) -> List[int]:
+        """
+        Adds a batch of orders to the auction. It can be called from any thread.
+
+        Returns
+        -------
+        sequences : List[int]
+            arrival number of each order
+        """
+        bucket = self._bucket()
+        sequence = self._sequence
+        sequences = []
+        with bucket.lock:
+            for order in orders:
+                levels = bucket.buy_levels if order.order_type == "BUY" else bucket.sell_levels
+                key = (order.p, order.q)
+                number = next(sequence)
+                entries = levels.get(key)
+                if entries is None:
+                    levels[key] = [(number, order)]
+                else:
+                    entries.append((number, order))
+                bucket.orders += 1
+                sequences.append(number)
+        return sequences
+
+    def drain(self) -> Tuple[List[AuctionOrder], List[AuctionOrder]]:
+        """
+        Merges the orders submitted so far into sorted lists of buy and sell
+        `AuctionOrder`s and empties the collector. Orders submitted while draining go
+        to the next auction.
+
+        Returns
+        -------
+        buy_orders, sell_orders : Tuple[List[AuctionOrder], List[AuctionOrder]]
+            the buy and sell orders sorted according to the user's willingness
+        """
+        with self._buckets_lock:
+            buckets = list(self._buckets)
+        buy_levels: Dict[Tuple[float, float], List[Entry]] = {}
+        sell_levels: Dict[Tuple[float, float], List[Entry]] = {}
+        for bucket in buckets:
+            with bucket.lock:
+                bucket_buy, bucket.buy_levels = bucket.buy_levels, {}
+                bucket_sell, bucket.sell_levels = bucket.sell_levels, {}
+                bucket.orders = 0
+            for levels, bucket_levels in ((buy_levels, bucket_buy), (sell_levels, bucket_sell)):
+                for key, entries in bucket_levels.items():
+                    levels.setdefault(key, []).extend(entries)
+
+        def auction_orders(levels: Dict[Tuple[float, float], List[Entry]], order_type: str) -> List[AuctionOrder]:
+            grouped = []
+            for entries in levels.values():
+                entries.sort(key=lambda entry: entry[0])
+                orders = [order for _, order in entries]
+                grouped.append(AuctionOrder(q=orders[0].q, p=orders[0].p, order_type=order_type, orders=orders))
+            return grouped
+
+        return sort_orders(auction_orders(buy_levels, "BUY"), auction_orders(sell_levels, "SELL"))
+
+    def manager(self) -> AuctionManager:
+        """
+        Drains the collector into a new `AuctionManager`, ready to allocate the orders.
+        """
+        manager = AuctionManager([])
+        manager.buy_orders, manager.sell_orders = self.drain()
+        return manager
@@ -0,0 +1,101 @@
+"""
+Phase level instrumentation of auctions.
+
+An `AuctionManager` created with a metrics sink measures the wall time of each phase
+of the auction and counts the work done by the matching, then hands an
+`AuctionMetrics` to the sink once the orders are allocated. Without a sink nothing is
+measured and the auction runs exactly as before.
+
+A sink is any callable that takes an `AuctionMetrics`. `MetricsRegistry` is a sink
+that accumulates the metrics of many auctions and renders them in the Prometheus
+text exposition format.
+"""
+from __future__ import annotations
+import threading
+from dataclasses import dataclass, fields
+from typing import Callable, List
+
+
+@dataclass(slots=True)
+class AuctionMetrics:
+    """
+    Metrics of a single auction.
+
+    Attributes
+    ----------
+    grouping : float
+        seconds spent grouping the orders into `AuctionOrder`s
+    sorting : float
+        seconds spent sorting the `AuctionOrder`s
+    matching : float
+        seconds spent in `allocate_orders`
+    orders : int
+        number of orders
+    levels_created : int
+        number of `AuctionOrder`s created
+    orders_merged : int
+        number of orders merged into an existing `AuctionOrder`
+    levels_visited : int
+        number of `AuctionOrder`s walked by `next_buy_order`/`next_sell_order`
+    match_iterations : int
+        number of matches between a buy and a sell `AuctionOrder`
+    """
+    grouping: float = 0
+    sorting: float = 0
+    matching: float = 0
+    orders: int = 0
+    levels_created: int = 0
+    orders_merged: int = 0
+    levels_visited: int = 0
+    match_iterations: int = 0
+
+
+MetricsSink = Callable[[AuctionMetrics], None]
+
+PHASES = ("grouping", "sorting", "matching")
+COUNTERS = ("orders", "levels_created", "orders_merged", "levels_visited", "match_iterations")
+
+
+class MetricsRegistry(object):
+    """
+    Metrics sink that accumulates the metrics of every auction.
+
+    Attributes
+    ----------
+    auctions : int
+        number of recorded auctions
+    totals : AuctionMetrics
+        sum of the metrics of every recorded auction
+    """
+    auctions: int
+    totals: AuctionMetrics
+
+    def __init__(self, prefix: str = "coral"):
+        self.prefix = prefix
+        self.auctions = 0
+        self.totals = AuctionMetrics()
+        self._lock = threading.Lock()
+
+    def __call__(self, metrics: AuctionMetrics) -> None:
+        with self._lock:
+            self.auctions += 1
+            for field in fields(AuctionMetrics):
+                setattr(self.totals, field.name,
+                        getattr(self.totals, field.name) + getattr(metrics, field.name))
+
+    def render(self) -> str:
+        """
+        Returns the accumulated metrics in the Prometheus text exposition format.
+        """
+        with self._lock:
+            lines: List[str] = [
+                f"# TYPE {self.prefix}_auctions_total counter",
+                f"{self.prefix}_auctions_total {self.auctions}",
+                f"# TYPE {self.prefix}_phase_seconds_total counter",
+            ]
+            lines += [f'{self.prefix}_phase_seconds_total{{phase="{phase}"}} {getattr(self.totals, phase)}'
+                      for phase in PHASES]
+            for counter in COUNTERS:
+                lines.append(f"# TYPE {self.prefix}_{counter}_total counter")
+                lines.append(f"{self.prefix}_{counter}_total {getattr(self.totals, counter)}")
+        return "\n".join(lines) + "\n"
@@ -0,0 +1,114 @@
+"""
+Parallel auctions for independent instruments.
+
+`run_auctions` spreads the auctions of many instruments over a process pool. Small
+books are sent in chunks, so a single task clears several instruments, while large
+books are written once to shared memory in the binary order format (see
+`coral.binary`) and read by the workers without unpickling any `Order`. That format
+stores quantities and prices as float64, so the results of those books hold floats,
+`q_max=4185.0` rather than `q_max=4185`, whatever the types of the orders.
+"""
+from __future__ import annotations
+import os
+import traceback
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from multiprocessing import shared_memory
+from typing import Dict, Hashable, List, Literal, Mapping, Optional, Tuple, Union
+
+from coral.batch import OrderBatch
+from coral.binary import dumps_orders, loads_orders
+from coral.core import AuctionResult, Order, run_auction
+
+Orders = Union[List[Order], OrderBatch]
+
+
+def _run_chunk(auctions: List[Tuple[Hashable, Orders]], engine: str) -> List[Tuple[Hashable, AuctionResult]]:
+    return [(symbol, run_auction(orders, engine=engine)) for symbol, orders in auctions]
+
+
+def _run_shared(symbol: Hashable, name: str, engine: str) -> List[Tuple[Hashable, AuctionResult]]:
+    memory = shared_memory.SharedMemory(name=name)
+    batch = None
+    try:
+        batch = loads_orders(memory.buf)
+        result = run_auction(batch, engine=engine)
+    except BaseException as error:
+        # The frames of the traceback hold views over the block too.
+        traceback.clear_frames(error.__traceback__)
+        raise
+    finally:
+        # Every view over the block must be released before closing it.
+        batch = None
+        memory.close()
+    return [(symbol, result)]
+
+
+def _portable(orders: Orders) -> Orders:
+    # Batches may wrap views (e.g. over a mapped file) that can't be pickled.
+    if isinstance(orders, OrderBatch):
+        return OrderBatch(list(orders.user_ids), array("b", orders.side),
+                          array("d", orders.q), array("d", orders.p))
+    return orders
+
+
+def run_auctions(auctions: Mapping[Hashable, Orders],
+                 engine: Literal['python', 'numpy'] = "python",
+                 max_workers: Optional[int] = None,
+                 chunk_size: int = 10_000,
+                 shared_memory_size: int = 100_000) -> Dict[Hashable, AuctionResult]:
+    """
+    Runs the auctions of many independent instruments over a process pool.
+
+    Parameters
+    ----------
+    auctions : Mapping[Hashable, List[Order] | OrderBatch]
+        orders of each instrument, keyed by its symbol
+    engine : Literal["python", "numpy"]
+        engine used to run each auction (see `run_auction`)
+    max_workers : int | None
+        number of worker processes, defaults to the number of CPUs
+    chunk_size : int
+        books smaller than `shared_memory_size` are grouped in tasks of up to
+        `chunk_size` orders
+    shared_memory_size : int
+        books with at least this number of orders are passed through shared memory
+
+    Returns
+    -------
+    results : Dict[Hashable, AuctionResult]
+        the result of each auction, in the same order as `auctions`. The results of
+        books passed through shared memory hold floats
+    """
+    shared: List[Tuple[Hashable, shared_memory.SharedMemory]] = []
+    chunks: List[List[Tuple[Hashable, Orders]]] = []
+    chunk: List[Tuple[Hashable, Orders]] = []
+    chunk_orders = 0
+    results: Dict[Hashable, AuctionResult] = {}
+    try:
+        for symbol, orders in auctions.items():
+            if len(orders) >= shared_memory_size:
+                data = dumps_orders(orders)
+                memory = shared_memory.SharedMemory(create=True, size=len(data))
+                shared.append((symbol, memory))
+                memory.buf[:len(data)] = data
+                continue
+            if chunk and chunk_orders + len(orders) > chunk_size:
+                chunks.append(chunk)
+                chunk, chunk_orders = [], 0
+            chunk.append((symbol, _portable(orders)))
+            chunk_orders += len(orders)
+        if chunk:
+            chunks.append(chunk)
+
+        with ProcessPoolExecutor(max_workers=max_workers or os.cpu_count()) as executor:
+            futures = [executor.submit(_run_shared, symbol, memory.name, engine)
+                       for symbol, memory in shared]
+            futures += [executor.submit(_run_chunk, chunk, engine) for chunk in chunks]
+            for future in futures:
+                results.update(future.result())
+    finally:
+        for _, memory in shared:
+            memory.close()
+            memory.unlink()
+    return {symbol: results[symbol] for symbol in auctions}
@@ -0,0 +1,230 @@
+"""
+Asyncio call auction service.
+
+The service accepts orders over a local TCP socket during a call window, clears the
+auction at the end of each window and publishes the result to its subscribers.
+
+The protocol is line based: every message is a JSON object on its own line.
+
+- `{"type": "order", "user_id": ..., "order_type": ..., "q": ..., "p": ...}` adds
+  an order to the current auction, replacing the previous order of the user. It is
+  answered with `{"type": "ack", "user_id": ..., "auction": ...}`.
+- `{"type": "cancel", "user_id": ...}` removes the order of a user, answered with
+  an "ack" message as well.
+- `{"type": "subscribe"}` turns the connection into a subscription. Every result is
+  then sent as `{"type": "result", "auction": ..., "q_max": ..., "p_min": ...,
+  "p_max": ...}`.
+
+Invalid messages are answered with `{"type": "error", "message": ...}`. A line
+longer than the limit of the stream reader, 64 KiB, is answered with an error as
+well and the connection is then closed, since the rest of the stream can't be split
+into messages anymore.
+
+Each connection is read one message at a time and its answer is drained before the
+next one is read, so a client that doesn't consume its answers is throttled by TCP
+flow control instead of growing the server buffers.
+"""
+from __future__ import annotations
+import asyncio
+import json
+from dataclasses import asdict
+from typing import Optional, Set, Tuple
+
+from coral.book import OrderBook
+from coral.core import AuctionResult, Order
+
+
+class AuctionService(object):
+    """
+    Collects orders during a call window and clears them at the end of it.
+
+    Attributes
+    ----------
+    window : float
+        length of the call window, in seconds
+    max_orders : int
+        maximum number of orders accepted in a single call window
+    max_published : int
+        number of results buffered for a slow subscriber before the oldest ones
+        are dropped
+    auction : int
+        number of the current auction, starting at 0
+    result : AuctionResult | None
+        result of the last auction
+    """
+    window: float
+    max_orders: int
+    max_published: int
+    auction: int
+    result: Optional[AuctionResult]
+
+    def __init__(self, window: float = 1.0, max_orders: int = 1_000_000, max_published: int = 100):
+        self.window = window
+        self.max_orders = max_orders
+        self.max_published = max_published
+        self.auction = 0
+        self.result = None
+        self._book = OrderBook()
+        self._subscribers: Set[asyncio.Queue] = set()
+        self._writers: Set[asyncio.StreamWriter] = set()
+        self._server: Optional[asyncio.AbstractServer] = None
+        self._clearing: Optional[asyncio.Task] = None
+
+    async def start(self, host: str = "127.0.0.1", port: int = 0) -> Tuple[str, int]:
+        """
+        Starts listening for connections and running the call windows.
+
+        Parameters
+        ----------
+        host : str
+            interface to listen on
+        port : int
+            port to listen on, `0` picks a free one
+
+        Returns
+        -------
+        address : Tuple[str, int]
+            the host and port the service listens on
+        """
+        self._server = await asyncio.start_server(self._handle, host, port)
+        self._clearing = asyncio.create_task(self._run())
+        return self._server.sockets[0].getsockname()[:2]
+
+    async def close(self) -> None:
+        """
+        Stops the service, closing every connection. The current call window is
+        discarded.
+        """
+        if self._clearing is not None:
+            self._clearing.cancel()
+        if self._server is not None:
+            self._server.close()
+        for queue in list(self._subscribers):
+            self.unsubscribe(queue)
+        for writer in list(self._writers):
+            writer.close()
+        if self._server is not None:
+            await self._server.wait_closed()
+
+    def submit(self, order: Order) -> None:
+        """
+        Adds an order to the current auction, replacing the previous order of the
+        same user.
+
+        Raises
+        ------
+        ValueError
+            if the current auction already holds `max_orders` orders
+        """
+        if order.user_id in self._book:
+            self._book.cancel(order.user_id)
+        elif len(self._book) >= self.max_orders:
+            raise ValueError("the auction is full")
+        self._book.insert(order)
+
+    def cancel(self, user_id: str) -> None:
+        """
+        Removes the order of a user from the current auction.
+
+        Raises
+        ------
+        KeyError
+            if the user has no order in the current auction
+        """
+        self._book.cancel(user_id)
+
+    def subscribe(self) -> asyncio.Queue:
+        """
+        Returns a queue that receives the `(auction, result)` pair of every auction,
+        and `None` when the service is closed.
+        """
+        queue: asyncio.Queue = asyncio.Queue(self.max_published)
+        self._subscribers.add(queue)
+        return queue
+
+    def unsubscribe(self, queue: asyncio.Queue) -> None:
+        """
+        Stops publishing results to a queue returned by `subscribe`.
+        """
+        if queue in self._subscribers:
+            self._subscribers.discard(queue)
+            self._put(queue, None)
+
+    def _put(self, queue: asyncio.Queue, item) -> None:
+        if queue.full():
+            queue.get_nowait()
+        queue.put_nowait(item)
+
+    async def _run(self) -> None:
+        loop = asyncio.get_running_loop()
+        while True:
+            await asyncio.sleep(self.window)
+            book, self._book = self._book, OrderBook()
+            auction = self.auction
+            self.auction += 1
+            # The closed book isn't shared anymore, so it can be cleared off the loop.
+            self.result = await loop.run_in_executor(None, book.clear)
+            for queue in self._subscribers:
+                self._put(queue, (auction, self.result))
+
+    def _apply(self, message: dict) -> dict:
+        if message.get("type") == "order":
+            self.submit(Order(user_id=str(message["user_id"]), order_type=message["order_type"],
+                              q=float(message["q"]), p=float(message["p"])))
+        elif message.get("type") == "cancel":
+            self.cancel(str(message["user_id"]))
+        else:
+            raise ValueError(f"unknown message type: {message.get('type')}")
+        return {"type": "ack", "user_id": message["user_id"], "auction": self.auction}
+
+    async def _handle(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        self._writers.add(writer)
+        try:
+            while True:
+                try:
+                    line = await reader.readline()
+                except (ValueError, asyncio.LimitOverrunError):
+                    # The line is longer than the reader's limit.
+                    writer.write(json.dumps({"type": "error", "message": "message too long"}).encode() + b"\n")
+                    await writer.drain()
+                    return
+                if not line:
+                    break
+                try:
+                    message = json.loads(line)
+                    if message.get("type") == "subscribe":
+                        await self._publish(writer)
+                        return
+                    answer = self._apply(message)
+                except (ValueError, KeyError, TypeError, AttributeError) as error:
+                    answer = {"type": "error", "message": str(error)}
+                writer.write(json.dumps(answer).encode() + b"\n")
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            self._writers.discard(writer)
+            writer.close()
+
+    async def _publish(self, writer: asyncio.StreamWriter) -> None:
+        queue = self.subscribe()
+        try:
+            while (item := await queue.get()) is not None:
+                auction, result = item
+                message = {"type": "result", "auction": auction, **asdict(result)}
+                writer.write(json.dumps(message).encode() + b"\n")
+                await writer.drain()
+        finally:
+            self.unsubscribe(queue)
+
+
+async def serve(host: str = "127.0.0.1", port: int = 8765, window: float = 1.0) -> None:
+    """
+    Runs an `AuctionService` until the task is cancelled.
+    """
+    service = AuctionService(window=window)
+    await service.start(host, port)
+    try:
+        await asyncio.Event().wait()
+    finally:
+        await service.close()
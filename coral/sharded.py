@@ -0,0 +1,143 @@
+"""
+Sharded construction of a single large book.
+
+The orders are split in contiguous shards that are grouped and sorted in worker
+processes. Each worker only receives the side, quantity and price columns of its
+shard and returns its levels as `(p, q, indexes)` tuples, so no `Order` is pickled.
+The sorted shards are then combined with a streaming k-way merge that joins the
+levels with equal price and quantity, which yields the same `buy_orders` and
+`sell_orders` as `AuctionManager`.
+"""
+from __future__ import annotations
+import os
+from array import array
+from concurrent.futures import ProcessPoolExecutor
+from heapq import merge
+from itertools import groupby
+from typing import Callable, Dict, Iterable, Iterator, List, Optional, Sequence, Tuple, Union
+
+from coral.batch import BUY, OrderBatch, side_code
+from coral.core import AuctionManager, AuctionOrder, Order
+
+Level = Tuple[float, float, array]
+
+
+def buy_level_priority(level: Level) -> Tuple[float, float]:
+    """
+    Sort key of a buy level, equivalent to `buy_priority`.
+    """
+    return (-level[0], -level[1])
+
+
+def sell_level_priority(level: Level) -> Tuple[float, float]:
+    """
+    Sort key of a sell level, equivalent to `sell_priority`.
+    """
+    return (level[0], -level[1])
+
+
+def group_shard(offset: int, side: Sequence[int], q: Sequence[float],
+                p: Sequence[float]) -> Tuple[List[Level], List[Level]]:
+    """
+    Groups a shard of orders into sorted `(p, q, indexes)` levels, where `indexes`
+    holds the position of each order of the level in the whole book.
+
+    Parameters
+    ----------
+    offset : int
+        position of the first order of the shard in the whole book
+    side : Sequence[int]
+        side code of each order
+    q : Sequence[float]
+        quantity of shares of each order
+    p : Sequence[float]
+        price of each order
+
+    Returns
+    -------
+    buy_levels, sell_levels : Tuple[List[Level], List[Level]]
+        the levels of each side, sorted according to the user's willingness
+    """
+    buy_levels: Dict[Tuple[float, float], Level] = {}
+    sell_levels: Dict[Tuple[float, float], Level] = {}
+    for index, (order_side, order_q, order_p) in enumerate(zip(side, q, p), offset):
+        levels = buy_levels if order_side == BUY else sell_levels
+        key = (order_p, order_q)
+        level = levels.get(key)
+        if level is None:
+            levels[key] = (order_p, order_q, array("q", (index,)))
+        else:
+            level[2].append(index)
+    return (
+        sorted(buy_levels.values(), key=buy_level_priority),
+        sorted(sell_levels.values(), key=sell_level_priority),
+    )
+
+
+def merge_levels(shards: Iterable[List[Level]], key: Callable[[Level], Tuple[float, float]]) -> Iterator[Level]:
+    """
+    Merges sorted shards of levels, joining the levels with equal price and quantity.
+
+    Levels are joined in shard order, so if the shards are contiguous slices of the
+    book their orders keep their original order.
+    """
+    for _, levels in groupby(merge(*shards, key=key), key=key):
+        p, q, indexes = next(levels)
+        indexes = array("q", indexes)
+        for level in levels:
+            indexes.extend(level[2])
+        yield p, q, indexes
+
+
+def group_orders_sharded(orders: Union[List[Order], OrderBatch], shards: Optional[int] = None,
+                         max_workers: Optional[int] = None) -> Tuple[List[AuctionOrder], List[AuctionOrder]]:
+    """
+    Groups the orders into sorted lists of buy and sell `AuctionOrder`s, like
+    `group_orders`, building the shards in parallel.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders to group
+    shards : int | None
+        number of shards, defaults to the number of workers
+    max_workers : int | None
+        number of worker processes, defaults to the number of CPUs
+
+    Returns
+    -------
+    buy_orders, sell_orders : Tuple[List[AuctionOrder], List[AuctionOrder]]
+        the buy and sell orders sorted according to the user's willingness
+    """
+    max_workers = max_workers or os.cpu_count() or 1
+    shards = max(1, shards or max_workers)
+    if isinstance(orders, OrderBatch):
+        side, q, p = array("b", orders.side), array("d", orders.q), array("d", orders.p)
+    else:
+        side = array("b", (side_code(order.order_type) for order in orders))
+        q = array("d", (order.q for order in orders))
+        p = array("d", (order.p for order in orders))
+    size = -(-len(side) // shards) or 1
+    offsets = range(0, len(side), size)
+    with ProcessPoolExecutor(max_workers=max_workers) as executor:
+        grouped = list(executor.map(
+            group_shard, offsets,
+            *([column[offset:offset + size] for offset in offsets] for column in (side, q, p))))
+
+    def auction_orders(levels: Iterator[Level], order_type: str) -> List[AuctionOrder]:
+        return [AuctionOrder(q=q, p=p, order_type=order_type, orders=[orders[index] for index in indexes])
+                for p, q, indexes in levels]
+
+    buy_levels = merge_levels((buy for buy, _ in grouped), buy_level_priority)
+    sell_levels = merge_levels((sell for _, sell in grouped), sell_level_priority)
+    return auction_orders(buy_levels, "BUY"), auction_orders(sell_levels, "SELL")
+
+
+def sharded_manager(orders: Union[List[Order], OrderBatch], shards: Optional[int] = None,
+                    max_workers: Optional[int] = None) -> AuctionManager:
+    """
+    Builds an `AuctionManager` whose book is grouped with `group_orders_sharded`.
+    """
+    manager = AuctionManager([])
+    manager.buy_orders, manager.sell_orders = group_orders_sharded(orders, shards, max_workers)
+    return manager
@@ -0,0 +1,170 @@
+"""
+Compact binary snapshots of an `AuctionManager`.
+
+A snapshot holds the grouped `buy_orders`/`sell_orders`, the `allocated` shares of
+each level and the `allocated`, `p_min`, `p_max`, `buy_index` and `sell_index` of the
+manager, so a restarted process can restore the manager and only replay the orders
+received after the snapshot. The layout, in little-endian byte order, is:
+
+- an 88 bytes header: the `CORALSN1` magic, the format version (uint32), a flags
+  field (uint32) telling if `p_min`/`p_max` are set, `allocated`, `p_min` and
+  `p_max` (float64), `buy_index`, `sell_index`, the number of buy and sell levels and
+  the number of orders (uint64) and the width of the user id column (uint32)
+- for each side, the `p`, `q` and `allocated` (float64) and the number of orders
+  (uint64) of every level
+- the user ids of the orders, level by level, UTF-8 encoded and padded with null
+  bytes to the column width
+
+Every order of a level shares its price, quantity and type, so only its user id is
+stored.
+"""
+from __future__ import annotations
+import io
+import mmap
+import struct
+import sys
+from array import array
+from typing import BinaryIO, List
+
+from coral.binary import FixedWidthStrings
+from coral.core import AuctionManager, AuctionOrder, Order
+
+MAGIC = b"CORALSN1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIdddQQQQQI4x")
+HAS_P_MIN = 1
+HAS_P_MAX = 2
+
+
+def _column(typecode: str, values) -> bytes:
+    column = array(typecode, values)
+    if sys.byteorder != "little":
+        column.byteswap()
+    return column.tobytes()
+
+
+def _view(buffer: memoryview, offset: int, count: int, typecode: str):
+    view = buffer[offset:offset + 8 * count].cast(typecode)
+    if sys.byteorder != "little":
+        view = array(typecode, view)
+        view.byteswap()
+    return view
+
+
+def _write(file: BinaryIO, manager: AuctionManager) -> None:
+    levels = (manager.buy_orders, manager.sell_orders)
+    user_ids = [order.user_id.encode("utf-8")
+                for auction_orders in levels for auction_order in auction_orders
+                for order in auction_order.orders]
+    width = max(map(len, user_ids), default=0)
+    flags = (HAS_P_MIN if manager.p_min is not None else 0) | (HAS_P_MAX if manager.p_max is not None else 0)
+    file.write(HEADER.pack(
+        MAGIC, VERSION, flags, manager.allocated,
+        manager.p_min if manager.p_min is not None else 0,
+        manager.p_max if manager.p_max is not None else 0,
+        manager.buy_index, manager.sell_index, len(manager.buy_orders), len(manager.sell_orders),
+        len(user_ids), width,
+    ))
+    for auction_orders in levels:
+        file.write(_column("d", (auction_order.p for auction_order in auction_orders)))
+        file.write(_column("d", (auction_order.q for auction_order in auction_orders)))
+        file.write(_column("d", (auction_order.allocated for auction_order in auction_orders)))
+        file.write(_column("Q", (len(auction_order.orders) for auction_order in auction_orders)))
+    for user_id in user_ids:
+        file.write(user_id.ljust(width, b"\0"))
+
+
+def write_snapshot(path: str, manager: AuctionManager) -> None:
+    """
+    Writes the snapshot of an `AuctionManager` to a file.
+    """
+    with open(path, "wb") as file:
+        _write(file, manager)
+
+
+def dumps_snapshot(manager: AuctionManager) -> bytes:
+    """
+    Returns the snapshot of an `AuctionManager`.
+    """
+    file = io.BytesIO()
+    _write(file, manager)
+    return file.getvalue()
+
+
+def loads_snapshot(buffer) -> AuctionManager:
+    """
+    Restores an `AuctionManager` from a buffer holding a snapshot, in a single pass.
+
+    Parameters
+    ----------
+    buffer : bytes | bytearray | memoryview | mmap.mmap
+        content of a snapshot
+
+    Returns
+    -------
+    manager : AuctionManager
+        the restored manager
+
+    Raises
+    ------
+    ValueError
+        if the buffer doesn't hold a snapshot
+    """
+    buffer = memoryview(buffer)
+    if len(buffer) < HEADER.size:
+        raise ValueError("not an AuctionManager snapshot")
+    (magic, version, flags, allocated, p_min, p_max, buy_index, sell_index,
+     buy_levels, sell_levels, orders, width) = HEADER.unpack(buffer[:HEADER.size])
+    if magic != MAGIC or version != VERSION:
+        raise ValueError("not an AuctionManager snapshot")
+    if len(buffer) < HEADER.size + 32 * (buy_levels + sell_levels) + width * orders:
+        raise ValueError("truncated AuctionManager snapshot")
+    offset = HEADER.size
+    sides = []
+    for count in (buy_levels, sell_levels):
+        columns = []
+        for typecode in "dddQ":
+            columns.append(_view(buffer, offset, count, typecode))
+            offset += 8 * count
+        sides.append(columns)
+    user_ids = FixedWidthStrings(buffer[offset:offset + width * orders], width, orders)
+
+    manager = AuctionManager([])
+    position = 0
+    restored: List[List[AuctionOrder]] = []
+    for order_type, (p, q, level_allocated, counts) in zip(("BUY", "SELL"), sides):
+        auction_orders = []
+        for level_p, level_q, level_allocation, count in zip(p, q, level_allocated, counts):
+            auction_orders.append(AuctionOrder(
+                q=level_q,
+                p=level_p,
+                order_type=order_type,
+                orders=[Order(user_id=user_id, order_type=order_type, q=level_q, p=level_p)
+                        for user_id in user_ids[position:position + count]],
+                allocated=level_allocation,
+            ))
+            position += count
+        restored.append(auction_orders)
+    manager.buy_orders, manager.sell_orders = restored
+    manager.allocated = allocated
+    manager.p_min = p_min if flags & HAS_P_MIN else None
+    manager.p_max = p_max if flags & HAS_P_MAX else None
+    manager.buy_index = buy_index
+    manager.sell_index = sell_index
+    return manager
+
+
+def load_snapshot(path: str) -> AuctionManager:
+    """
+    Restores an `AuctionManager` from a snapshot file, reading it through a memory map.
+
+    Raises
+    ------
+    ValueError
+        if the file is not a snapshot
+    """
+    with open(path, "rb") as file:
+        if file.read(len(MAGIC)) != MAGIC:
+            raise ValueError(f"{path} is not an AuctionManager snapshot")
+        buffer = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+    return loads_snapshot(buffer)
@@ -0,0 +1,155 @@
+"""
+Streaming auction ingestion.
+
+Orders are aggregated on the fly into the price/quantity levels that
+`AuctionManager` groups them by, so an auction can be cleared from a generator or
+from an order file while only holding one counter per distinct level in memory.
+
+Order files can be NDJSON (one JSON object per line) or CSV (with a header), both
+with the `user_id`, `order_type`, `q` and `p` fields of `Order`.
+"""
+from __future__ import annotations
+import csv
+import json
+import os
+from typing import Dict, Iterable, Iterator, List, Tuple, Union
+
+from coral.core import AuctionResult, Order, clear_levels
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+NDJSON_SUFFIXES = (".ndjson", ".jsonl")
+CSV_SUFFIXES = (".csv",)
+
+
+class LevelAggregator(object):
+    """
+    Counts the orders of each price/quantity level.
+
+    Attributes
+    ----------
+    buy_counts : Dict[Tuple[float, float], int]
+        number of "BUY" orders for each `(p, q)` pair
+    sell_counts : Dict[Tuple[float, float], int]
+        number of "SELL" orders for each `(p, q)` pair
+    orders : int
+        total number of aggregated orders
+    """
+    buy_counts: Dict[Tuple[float, float], int]
+    sell_counts: Dict[Tuple[float, float], int]
+    orders: int
+
+    def __init__(self, orders: Iterable[Order] = ()):
+        self.buy_counts = {}
+        self.sell_counts = {}
+        self.orders = 0
+        self.extend(orders)
+
+    def add(self, order: Order) -> None:
+        """
+        Adds an order to its level.
+        """
+        self.extend((order,))
+
+    def extend(self, orders: Iterable[Order]) -> None:
+        """
+        Adds every order of an iterable, consuming it lazily.
+        """
+        buy_counts = self.buy_counts
+        sell_counts = self.sell_counts
+        count = 0
+        for order in orders:
+            counts = buy_counts if order.order_type == "BUY" else sell_counts
+            key = (order.p, order.q)
+            counts[key] = counts.get(key, 0) + 1
+            count += 1
+        self.orders += count
+
+    def buy_levels(self) -> List[Tuple[float, float, int]]:
+        """
+        Returns the `(p, q, count)` buy levels sorted according to the user's
+        willingness to buy, in the same order as `buy_priority`.
+        """
+        return sorted(((p, q, count) for (p, q), count in self.buy_counts.items()),
+                      key=lambda level: (-level[0], -level[1]))
+
+    def sell_levels(self) -> List[Tuple[float, float, int]]:
+        """
+        Returns the `(p, q, count)` sell levels sorted according to the user's
+        willingness to sell, in the same order as `sell_priority`.
+        """
+        return sorted(((p, q, count) for (p, q), count in self.sell_counts.items()),
+                      key=lambda level: (level[0], -level[1]))
+
+    def clear(self) -> AuctionResult:
+        """
+        Runs an auction over the aggregated levels.
+
+        Returns
+        -------
+        result : AuctionResult
+            the result of the auction
+        """
+        return clear_levels(
+            ((p, q * count) for p, q, count in self.buy_levels()),
+            ((p, q * count) for p, q, count in self.sell_levels()),
+        )
+
+
+def read_ndjson(path: PathLike) -> Iterator[Order]:
+    """
+    Lazily reads the orders of an NDJSON file. Blank lines are skipped.
+    """
+    with open(path, "r") as file:
+        for line in file:
+            if line.strip():
+                data = json.loads(line)
+                yield Order(user_id=data["user_id"], order_type=data["order_type"],
+                            q=data["q"], p=data["p"])
+
+
+def read_csv(path: PathLike) -> Iterator[Order]:
+    """
+    Lazily reads the orders of a CSV file with a `user_id,order_type,q,p` header.
+    """
+    with open(path, "r", newline="") as file:
+        for row in csv.DictReader(file):
+            yield Order(user_id=row["user_id"], order_type=row["order_type"],
+                        q=float(row["q"]), p=float(row["p"]))
+
+
+def read_orders(path: PathLike) -> Iterator[Order]:
+    """
+    Lazily reads the orders of an NDJSON or CSV file, chosen by its extension.
+
+    Raises
+    ------
+    ValueError
+        if the extension of the file is not supported
+    """
+    suffix = os.path.splitext(os.fspath(path))[1].lower()
+    if suffix in NDJSON_SUFFIXES:
+        return read_ndjson(path)
+    if suffix in CSV_SUFFIXES:
+        return read_csv(path)
+    raise ValueError(f"unsupported order file: {path}")
+
+
+def run_auction_stream(orders: Union[Iterable[Order], PathLike]) -> AuctionResult:
+    """
+    Runs an auction over an iterable of orders or an order file, holding in memory
+    only the distinct price/quantity levels.
+
+    Parameters
+    ----------
+    orders : Iterable[Order] | PathLike
+        orders that take part in the auction, or the path of an NDJSON/CSV file
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    if isinstance(orders, (str, os.PathLike)):
+        orders = read_orders(orders)
+    return LevelAggregator(orders).clear()
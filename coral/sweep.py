@@ -0,0 +1,173 @@
+"""
+Scenario sweeps over a shared book.
+
+A `ScenarioSweep` sorts and indexes the book once (see `coral.depth`) and then
+answers how the result of the auction changes under many scenarios, each one in
+O(log n): leaving a user out, adding an order or scaling the quantities of a side.
+Leaving out a user with `m` orders takes O(m log m + log n log m), so a whole
+leave-one-out sweep stays O(n log^2 n). The results are returned as a columnar
+`SweepTable`.
+"""
+from __future__ import annotations
+import math
+from array import array
+from dataclasses import dataclass
+from typing import Dict, Iterable, Iterator, List, Literal, Tuple, Union
+
+from coral.core import AuctionResult, Order, group_orders
+from coral.depth import DepthIndex, levels
+
+
+@dataclass(slots=True, frozen=True)
+class RemoveUser:
+    """
+    Scenario in which the orders of a user are left out of the auction.
+    """
+    user_id: str
+
+
+@dataclass(slots=True, frozen=True)
+class AddOrder:
+    """
+    Scenario in which an order is added to the auction.
+    """
+    order: Order
+
+
+@dataclass(slots=True, frozen=True)
+class ScaleSide:
+    """
+    Scenario in which the quantity of every order of a side is multiplied by a factor.
+    """
+    order_type: Literal['BUY', 'SELL']
+    factor: float
+
+
+Scenario = Union[RemoveUser, AddOrder, ScaleSide]
+
+
+@dataclass(slots=True)
+class SweepTable:
+    """
+    Columnar results of a sweep. Missing prices are stored as NaN.
+
+    Attributes
+    ----------
+    scenarios : List[Scenario]
+        the scenario of each row
+    q_max : Sequence[float]
+        number of shares exchanged in each scenario
+    p_min : Sequence[float]
+        minimum clearing price of each scenario
+    p_max : Sequence[float]
+        maximum clearing price of each scenario
+    """
+    scenarios: List[Scenario]
+    q_max: array
+    p_min: array
+    p_max: array
+
+    def __len__(self) -> int:
+        return len(self.scenarios)
+
+    def results(self) -> Iterator[AuctionResult]:
+        """
+        Yields the `AuctionResult` of each row.
+        """
+        for q_max, p_min, p_max in zip(self.q_max, self.p_min, self.p_max):
+            yield AuctionResult(
+                q_max=q_max,
+                p_min=None if math.isnan(p_min) else p_min,
+                p_max=None if math.isnan(p_max) else p_max,
+            )
+
+
+class ScenarioSweep(object):
+    """
+    Evaluates scenarios over a book that is sorted and indexed only once.
+
+    Attributes
+    ----------
+    orders : List[Order]
+        orders of the book
+    index : DepthIndex
+        depth index over the book
+    """
+    orders: List[Order]
+    index: DepthIndex
+
+    def __init__(self, orders: Iterable[Order]):
+        """
+        Constructs a ScenarioSweep, grouping and indexing the orders.
+
+        Parameters
+        ----------
+        orders : Iterable[Order]
+            orders of the book
+        """
+        self.orders = list(orders)
+        buy_orders, sell_orders = group_orders(self.orders)
+        # The index skips empty levels, so positions are counted the same way.
+        buy_orders = [auction_order for auction_order in buy_orders if auction_order.q_total]
+        sell_orders = [auction_order for auction_order in sell_orders if auction_order.q_total]
+        self.index = DepthIndex(levels(buy_orders), levels(sell_orders))
+        self._levels: Dict[Tuple[str, float, float], int] = {}
+        for order_type, auction_orders in (("BUY", buy_orders), ("SELL", sell_orders)):
+            for level, auction_order in enumerate(auction_orders):
+                self._levels[(order_type, auction_order.p, auction_order.q)] = level
+        self._users: Dict[str, List[Order]] = {}
+        for order in self.orders:
+            self._users.setdefault(order.user_id, []).append(order)
+
+    def evaluate(self, scenario: Scenario) -> AuctionResult:
+        """
+        Returns the result of the auction under a scenario.
+
+        The orders of a user are removed level by level from the shared index (see
+        `DepthIndex.without_many`), so a user with `m` orders takes O(m log m + log n log m).
+        """
+        if isinstance(scenario, AddOrder):
+            return self.index.what_if(scenario.order)
+        if isinstance(scenario, ScaleSide):
+            return self.index.scaled(scenario.order_type, scenario.factor)
+        if isinstance(scenario, RemoveUser):
+            removals = []
+            for order in self._users.get(scenario.user_id, []):
+                # Empty orders are not indexed.
+                if order.q:
+                    order_type = "BUY" if order.order_type == "BUY" else "SELL"
+                    removals.append((order_type, self._levels[(order_type, order.p, order.q)], order.q))
+            if not removals:
+                return self.index.result()
+            return self.index.without_many(removals)
+        raise TypeError(f"unknown scenario: {scenario!r}")
+
+    def run(self, scenarios: Iterable[Scenario]) -> SweepTable:
+        """
+        Evaluates a batch of scenarios.
+
+        Parameters
+        ----------
+        scenarios : Iterable[Scenario]
+            scenarios to evaluate, independently of each other
+
+        Returns
+        -------
+        table : SweepTable
+            the result of each scenario
+        """
+        table = SweepTable(scenarios=[], q_max=array("d"), p_min=array("d"), p_max=array("d"))
+        for scenario in scenarios:
+            result = self.evaluate(scenario)
+            table.scenarios.append(scenario)
+            table.q_max.append(result.q_max)
+            table.p_min.append(math.nan if result.p_min is None else result.p_min)
+            table.p_max.append(math.nan if result.p_max is None else result.p_max)
+        return table
+
+    def leave_one_out(self) -> SweepTable:
+        """
+        Evaluates the auction leaving out each user in turn, in order of first
+        appearance.
+        """
+        return self.run(RemoveUser(user_id) for user_id in self._users)
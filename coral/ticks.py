@@ -0,0 +1,131 @@
+"""
+Integer tick/lot representation of orders.
+
+Prices and quantities given as floats accumulate rounding errors while the shares
+are allocated, which can leave an `AuctionOrder` almost, but not exactly, fulfilled.
+A `TickScale` converts prices to an integer number of ticks and quantities to an
+integer number of lots, so the auction runs on exact integers and only its result is
+converted back to floats.
+"""
+from __future__ import annotations
+import os
+from array import array
+from decimal import Decimal
+from typing import Iterable, Iterator, List, Union
+
+from coral.batch import OrderBatch
+from coral.core import AuctionResult, Order
+
+
+class TickScale(object):
+    """
+    Scale between prices/quantities and integer ticks/lots.
+
+    Attributes
+    ----------
+    tick_size : float
+        price increment represented by one tick
+    lot_size : float
+        quantity represented by one lot
+    """
+    tick_size: float
+    lot_size: float
+
+    def __init__(self, tick_size: float, lot_size: float = 1):
+        """
+        Constructs a TickScale.
+
+        Raises
+        ------
+        ValueError
+            if the tick or lot size isn't positive
+        """
+        if tick_size <= 0 or lot_size <= 0:
+            raise ValueError("the tick and lot sizes must be positive")
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        # Converting back through decimals gives the shortest float, e.g. 100.15
+        # instead of 100.15000000000001 for 2003 ticks of 0.05.
+        self._tick = Decimal(str(tick_size))
+        self._lot = Decimal(str(lot_size))
+
+    @staticmethod
+    def _scale(value: float, size: float, name: str) -> int:
+        scaled = value / size
+        rounded = round(scaled)
+        if abs(scaled - rounded) > 1e-9 * max(1, abs(rounded)):
+            raise ValueError(f"{name} {value} is not a multiple of {size}")
+        return rounded
+
+    def to_ticks(self, p: float) -> int:
+        """
+        Converts a price to ticks.
+
+        Raises
+        ------
+        ValueError
+            if the price isn't a multiple of the tick size
+        """
+        return self._scale(p, self.tick_size, "price")
+
+    def to_lots(self, q: float) -> int:
+        """
+        Converts a quantity to lots.
+
+        Raises
+        ------
+        ValueError
+            if the quantity isn't a multiple of the lot size
+        """
+        return self._scale(q, self.lot_size, "quantity")
+
+    def from_ticks(self, ticks: int) -> float:
+        """
+        Converts a number of ticks to a price.
+        """
+        return float(ticks * self._tick)
+
+    def from_lots(self, lots: int) -> float:
+        """
+        Converts a number of lots to a quantity.
+        """
+        return float(lots * self._lot)
+
+    def scale_order(self, order: Order) -> Order:
+        """
+        Returns a copy of an order with its price in ticks and its quantity in lots.
+        """
+        return Order(user_id=order.user_id, order_type=order.order_type,
+                     q=self.to_lots(order.q), p=self.to_ticks(order.p))
+
+    def scale_orders(self, orders: Union[List[Order], OrderBatch, Iterable[Order], str]
+                     ) -> Union[List[Order], OrderBatch, Iterator[Order]]:
+        """
+        Converts the prices and quantities of a list of orders to ticks and lots.
+
+        Lists give lists, `OrderBatch`es give `OrderBatch`es with int64 columns and any
+        other iterable, or the path of an order file (see `coral.streaming`), gives a
+        lazy iterator.
+        """
+        if isinstance(orders, OrderBatch):
+            return OrderBatch(orders.user_ids, orders.side,
+                              array("q", map(self.to_lots, orders.q)),
+                              array("q", map(self.to_ticks, orders.p)))
+        if isinstance(orders, (list, tuple)):
+            return [self.scale_order(order) for order in orders]
+        if isinstance(orders, (str, os.PathLike)):
+            from coral.streaming import read_orders
+            orders = read_orders(orders)
+        return map(self.scale_order, orders)
+
+    def unscale_result(self, result: AuctionResult) -> AuctionResult:
+        """
+        Converts the result of an auction run in ticks and lots back to floats.
+        """
+        if result.p_max is None:
+            return AuctionResult(q_max=self.from_lots(result.q_max), p_min=None, p_max=None)
+        return AuctionResult(
+            q_max=self.from_lots(result.q_max),
+            p_min=self.from_ticks(result.p_min),
+            p_max=self.from_ticks(result.p_max),
+        )
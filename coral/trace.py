@@ -0,0 +1,166 @@
+"""
+Structured trace of the matching steps of an auction.
+
+An `AuctionManager` created with a `MatchTrace` records every step of
+`allocate_orders` as a fixed-size binary record in a preallocated ring buffer: the
+positions and prices of the matched buy and sell `AuctionOrder`s, the allocated
+quantity and the price range after the step. Once the buffer is full the oldest
+records are overwritten. Without a trace the matching loop is the plain one, so
+tracing costs nothing when it is disabled.
+
+A trace can be dumped to a binary file. In little-endian byte order, it holds:
+
+- a 32 bytes header: the `CORALTR1` magic, the format version (uint32), the record
+  size (uint32), the number of recorded steps (uint64) and the number of steps that
+  were overwritten (uint64)
+- the records, oldest first, each one with the step number, buy index and sell index
+  (uint64) followed by the buy price, sell price, quantity, `p_min` and `p_max`
+  (float64)
+"""
+from __future__ import annotations
+import math
+import struct
+from dataclasses import dataclass
+from typing import List, Optional
+
+MAGIC = b"CORALTR1"
+VERSION = 1
+HEADER = struct.Struct("<8sIIQQ")
+RECORD = struct.Struct("<QQQddddd")
+
+
+@dataclass(slots=True)
+class TraceStep:
+    """
+    A matching step of an auction.
+
+    Attributes
+    ----------
+    step : int
+        sequence number of the step within the trace
+    buy_index : int
+        position of the matched buy `AuctionOrder` in `buy_orders`
+    sell_index : int
+        position of the matched sell `AuctionOrder` in `sell_orders`
+    buy_p : float
+        price of the matched buy `AuctionOrder`
+    sell_p : float
+        price of the matched sell `AuctionOrder`
+    q : float
+        number of shares allocated by the step
+    p_min : float
+        minimum price of the auction after the step
+    p_max : float
+        maximum price of the auction after the step
+    """
+    step: int
+    buy_index: int
+    sell_index: int
+    buy_p: float
+    sell_p: float
+    q: float
+    p_min: float
+    p_max: float
+
+
+class MatchTrace(object):
+    """
+    Ring buffer of fixed-size matching records.
+
+    Attributes
+    ----------
+    capacity : int
+        maximum number of records kept
+    steps : int
+        number of steps recorded so far, including the overwritten ones
+    """
+
+    def __init__(self, capacity: int = 65536):
+        if capacity <= 0:
+            raise ValueError("the trace capacity must be positive")
+        self.capacity = capacity
+        self.steps = 0
+        self._buffer = bytearray(capacity * RECORD.size)
+
+    def __len__(self) -> int:
+        return min(self.steps, self.capacity)
+
+    @property
+    def dropped(self) -> int:
+        """
+        Number of records overwritten because the buffer was full.
+        """
+        return self.steps - len(self)
+
+    def record(self, buy_index: int, sell_index: int, buy_p: float, sell_p: float, q: float,
+               p_min: Optional[float], p_max: Optional[float]) -> None:
+        """
+        Writes a matching step into the buffer, overwriting the oldest one when it is
+        full. Missing prices are stored as NaN.
+        """
+        RECORD.pack_into(self._buffer, (self.steps % self.capacity) * RECORD.size,
+                         self.steps, buy_index, sell_index, buy_p, sell_p, q,
+                         math.nan if p_min is None else p_min, math.nan if p_max is None else p_max)
+        self.steps += 1
+
+    def clear(self) -> None:
+        """
+        Discards every record, keeping the buffer.
+        """
+        self.steps = 0
+
+    def records(self) -> bytes:
+        """
+        Returns the raw records, oldest first.
+        """
+        end = len(self) * RECORD.size
+        if self.steps <= self.capacity:
+            return bytes(self._buffer[:end])
+        split = (self.steps % self.capacity) * RECORD.size
+        return bytes(self._buffer[split:] + self._buffer[:split])
+
+    def __iter__(self):
+        for fields in RECORD.iter_unpack(self.records()):
+            yield TraceStep(*fields)
+
+    def dumps(self) -> bytes:
+        """
+        Serializes the trace into the binary trace format.
+        """
+        return HEADER.pack(MAGIC, VERSION, RECORD.size, len(self), self.dropped) + self.records()
+
+    def dump(self, path: str) -> None:
+        """
+        Writes the trace to a binary trace file.
+        """
+        with open(path, "wb") as file:
+            file.write(self.dumps())
+
+
+def loads_trace(buffer) -> List[TraceStep]:
+    """
+    Reads the steps of a binary trace.
+
+    Raises
+    ------
+    ValueError
+        if the buffer isn't a binary trace
+    """
+    buffer = memoryview(buffer)
+    if len(buffer) < HEADER.size:
+        raise ValueError("not a match trace")
+    magic, version, record_size, count, _ = HEADER.unpack_from(buffer)
+    if magic != MAGIC or version != VERSION or record_size != RECORD.size:
+        raise ValueError("not a match trace")
+    records = buffer[HEADER.size:HEADER.size + count * RECORD.size]
+    if len(records) != count * RECORD.size:
+        raise ValueError("truncated match trace")
+    return [TraceStep(*fields) for fields in RECORD.iter_unpack(records)]
+
+
+def load_trace(path: str) -> List[TraceStep]:
+    """
+    Reads the steps of a binary trace file.
+    """
+    with open(path, "rb") as file:
+        return loads_trace(file.read())
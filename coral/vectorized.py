@@ -0,0 +1,247 @@
+"""
+Vectorized clearing engine built on NumPy.
+
+The auction is cleared from columnar arrays instead of `AuctionOrder` objects. Each
+side is sorted by price, the cumulative demand and supply curves are built with
+`cumsum`, and the point where the matching stops is found with `searchsorted`.
+"""
+from __future__ import annotations
+from numbers import Integral
+from typing import Iterable, List, Union
+
+try:
+    import numpy as np
+except ImportError as error:  # pragma: no cover
+    raise ImportError(
+        "the numpy engine requires numpy, install it with `pip install coral[numpy]`") from error
+
+from coral.allocation import AllocationReport
+from coral.batch import BUY, OrderBatch
+from coral.core import AuctionResult, Order
+
+
+def as_numeric(column) -> np.ndarray:
+    """
+    Wraps a column as an int64 array if it holds integers, such as the ticks and lots
+    of `coral.ticks`, or as a float64 array otherwise.
+    """
+    column = np.asarray(column)
+    if column.dtype.kind in "iub":
+        return column.astype(np.int64, copy=False)
+    return column.astype(np.float64, copy=False)
+
+
+def numeric_fromiter(values: Iterable[Union[int, float]], count: int, first: Union[int, float]) -> np.ndarray:
+    """
+    Builds a column from an iterable of numbers with `np.fromiter`, without an
+    intermediate list. When the first value is an integer and every value is integral,
+    as with the ticks and lots of `coral.ticks`, the column is an int64 array so it is
+    cleared with exact integer arithmetic. Otherwise it is a float64 array.
+    """
+    column = np.fromiter(values, dtype=np.float64, count=count)
+    if isinstance(first, Integral) and np.all(np.abs(column) <= 2 ** 53) and np.array_equal(column, np.trunc(column)):
+        return column.astype(np.int64)
+    return column
+
+
+def clear_arrays(is_buy: np.ndarray, q: np.ndarray, p: np.ndarray) -> AuctionResult:
+    """
+    Clears an auction described by columnar arrays.
+
+    It returns the same result as `AuctionManager.allocate_orders`. The matching walks
+    the buy orders from the highest to the lowest price and the sell orders from the
+    lowest to the highest price, so it can only stop where one of the cumulative
+    curves has a step. Those steps are evaluated all at once and the first one at
+    which the current buy price falls below the current sell price gives `q_max`.
+
+    Parameters
+    ----------
+    is_buy : np.ndarray
+        boolean array, `True` for "BUY" orders and `False` for "SELL" orders
+    q : np.ndarray
+        quantity of shares of each order
+    p : np.ndarray
+        price of each order
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction. Integer columns are cleared with exact integer
+        arithmetic and give integer results
+    """
+    is_buy = np.asarray(is_buy, dtype=bool)
+    q = as_numeric(q)
+    p = as_numeric(p)
+
+    buy_p = p[is_buy]
+    buy_q = q[is_buy]
+    sell_p = p[~is_buy]
+    sell_q = q[~is_buy]
+    # Orders with equal prices are interchangeable for the clearing result, so
+    # sorting by price alone is enough.
+    buy_sort = np.argsort(-buy_p, kind="stable")
+    sell_sort = np.argsort(sell_p, kind="stable")
+    buy_p = buy_p[buy_sort]
+    sell_p = sell_p[sell_sort]
+    demand = np.cumsum(buy_q[buy_sort])
+    supply = np.cumsum(sell_q[sell_sort])
+
+    if len(demand) == 0 or len(supply) == 0:
+        return AuctionResult(q_max=0, p_min=None, p_max=None)
+    q_limit = min(demand[-1], supply[-1])
+    if q_limit <= 0:
+        return AuctionResult(q_max=0, p_min=None, p_max=None)
+
+    # Every point at which either side moves on to its next order.
+    steps = np.concatenate((np.zeros(1, dtype=demand.dtype), demand, supply))
+    steps = np.unique(steps[steps < q_limit])
+    buy_index = np.searchsorted(demand, steps, side="right")
+    sell_index = np.searchsorted(supply, steps, side="right")
+    stops = np.flatnonzero(buy_p[buy_index] < sell_p[sell_index])
+    q_max = steps[stops[0]] if len(stops) else q_limit
+    if q_max <= 0:
+        return AuctionResult(q_max=0, p_min=None, p_max=None)
+
+    p_max = buy_p[np.searchsorted(demand, 0, side="right")]
+    p_min = sell_p[np.searchsorted(supply, q_max, side="left")]
+    return AuctionResult(q_max=q_max.item(), p_min=p_min.item(), p_max=p_max.item())
+
+
+def clear_batch(batch: OrderBatch) -> AuctionResult:
+    """
+    Clears an auction described by an `OrderBatch`, wrapping its columns without copies
+    when they are already typed arrays.
+
+    Parameters
+    ----------
+    batch : OrderBatch
+        orders that take part in the auction
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    return clear_arrays(np.asarray(batch.side) == BUY, batch.q, batch.p)
+
+
+def allocate_arrays(is_buy: np.ndarray, q: np.ndarray, p: np.ndarray, q_max: float,
+                    whole_shares: bool = False) -> np.ndarray:
+    """
+    Computes the shares allocated to each order once `q_max` is known.
+
+    The orders of each side are sorted and grouped like `AuctionManager` does. The
+    levels are filled in order until `q_max` shares are allocated, so the fill of a
+    level is its cumulative quantity clipped to `q_max`. Orders of fulfilled levels
+    get their whole quantity and the orders of the only partially allocated level
+    of each side share its fill pro-rata, as in `AuctionOrder.split_allocation`.
+
+    Parameters
+    ----------
+    is_buy : np.ndarray
+        boolean array, `True` for "BUY" orders and `False` for "SELL" orders
+    q : np.ndarray
+        quantity of shares of each order
+    p : np.ndarray
+        price of each order
+    q_max : float
+        number of shares exchanged in the auction
+    whole_shares : bool
+        if `True` the pro-rata split only allocates whole shares, handing out the
+        remaining ones by largest remainder
+
+    Returns
+    -------
+    filled : np.ndarray
+        the shares allocated to each order
+    """
+    is_buy = np.asarray(is_buy, dtype=bool)
+    q = np.asarray(q, dtype=np.float64)
+    p = np.asarray(p, dtype=np.float64)
+    filled = np.zeros(len(q), dtype=np.float64)
+    if q_max == 0:
+        return filled
+    for rows, price_key in ((np.flatnonzero(is_buy), -p), (np.flatnonzero(~is_buy), p)):
+        if len(rows) == 0:
+            continue
+        # `lexsort` is stable, so equal orders keep their arrival order.
+        rows = rows[np.lexsort((-q[rows], price_key[rows]))]
+        rows_q = q[rows]
+        rows_p = p[rows]
+        starts = np.flatnonzero(np.concatenate(
+            ([True], (rows_p[1:] != rows_p[:-1]) | (rows_q[1:] != rows_q[:-1]))))
+        counts = np.diff(np.append(starts, len(rows)))
+        level_total = rows_q[starts] * counts
+        level_end = np.cumsum(level_total)
+        level_fill = np.clip(q_max - (level_end - level_total), 0, level_total)
+        fulfilled = np.repeat(level_fill == level_total, counts)
+        filled[rows[fulfilled]] = rows_q[fulfilled]
+        partial = np.flatnonzero((level_fill > 0) & (level_fill < level_total))
+        for level in partial:
+            level_rows = rows[starts[level]:starts[level] + counts[level]]
+            weights = q[level_rows]
+            shares = level_fill[level] * weights / weights.sum()
+            if whole_shares:
+                floors = np.floor(shares)
+                remaining = int(np.floor(level_fill[level]) - floors.sum())
+                by_remainder = np.argsort(floors - shares, kind="stable")
+                floors[by_remainder[:remaining]] += 1
+                shares = floors
+            filled[level_rows] = shares
+    return filled
+
+
+def allocation_report_numpy(orders: Union[List[Order], OrderBatch],
+                            whole_shares: bool = False) -> AllocationReport:
+    """
+    Runs an auction with the vectorized engine and reports the shares allocated to
+    each order.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders that take part in the auction
+    whole_shares : bool
+        if `True` the pro-rata split only allocates whole shares
+
+    Returns
+    -------
+    report : AllocationReport
+        the fill of every order
+    """
+    if not isinstance(orders, OrderBatch):
+        orders = OrderBatch.from_orders(orders)
+    is_buy = np.asarray(orders.side) == BUY
+    result = clear_arrays(is_buy, orders.q, orders.p)
+    filled = allocate_arrays(is_buy, orders.q, orders.p, result.q_max, whole_shares)
+    return AllocationReport(
+        result=result,
+        user_ids=orders.user_ids,
+        side=orders.side,
+        q=orders.q,
+        p=orders.p,
+        filled=filled,
+    )
+
+
+def run_auction_numpy(orders: Union[List[Order], OrderBatch]) -> AuctionResult:
+    """
+    Runs an auction over a list of orders with the vectorized engine.
+
+    Parameters
+    ----------
+    orders : List[Order] | OrderBatch
+        list of orders that take part in the auction
+
+    Returns
+    -------
+    result : AuctionResult
+        the result of the auction
+    """
+    if isinstance(orders, OrderBatch):
+        return clear_batch(orders)
+    count = len(orders)
+    is_buy = np.fromiter((order.order_type == "BUY" for order in orders), dtype=bool, count=count)
+    q = numeric_fromiter((order.q for order in orders), count, orders[0].q if count else 0.0)
+    p = numeric_fromiter((order.p for order in orders), count, orders[0].p if count else 0.0)
+    return clear_arrays(is_buy, q, p)
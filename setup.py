@@ -1,3 +1,9 @@
 from setuptools import setup, find_packages
 
-setup(name="coral", packages=find_packages())
\ No newline at end of file
+setup(
+    name="coral",
+    packages=find_packages(),
+    python_requires=">=3.10",
+    extras_require={"numpy": ["numpy"]},
+    entry_points={"console_scripts": ["coral=coral.cli:main"]},
+)
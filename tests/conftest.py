@@ -0,0 +1,57 @@
+import random
+
+import pytest
+
+from coral.core import Order
+
+INTEGER_QUANTITIES = [0, 1, 3, 10, 25]
+# Dyadic fractions are exact in binary floating point, so every engine has to agree
+# on them exactly.
+FRACTIONAL_QUANTITIES = [0, 0.25, 0.5, 1.75, 2.5, 12.125]
+PRICES = [100, 150, 200, 250, 300]
+DECIMAL_QUANTITIES = [0, 0.1, 0.2, 0.3, 1.7]
+DECIMAL_PRICES = [98.5, 99, 99.5, 100, 100.5]
+# Large quantities next to single shares, where a relative tolerance would span levels.
+LARGE_QUANTITIES = [0, 1, 2, 10 ** 9, 2 * 10 ** 9, 3 * 10 ** 9 + 1]
+
+
+def make_orders(rng: random.Random, count: int, quantities=INTEGER_QUANTITIES, prices=PRICES):
+    return [
+        Order(user_id=f"U{i}", order_type=rng.choice(["BUY", "SELL"]),
+              q=rng.choice(quantities), p=rng.choice(prices))
+        for i in range(count)
+    ]
+
+
+@pytest.fixture(params=[INTEGER_QUANTITIES, FRACTIONAL_QUANTITIES], ids=["integer", "fractional"])
+def random_orders(request):
+    """
+    Factory of random books, `random_orders(rng, count)`. Tests that use it run once
+    with integer quantities and once with fractional ones.
+    """
+    def factory(rng: random.Random, count: int, quantities=request.param, prices=PRICES):
+        return make_orders(rng, count, quantities, prices)
+    return factory
+
+
+@pytest.fixture
+def decimal_orders():
+    """
+    Factory of random books with decimal quantities, `decimal_orders(rng, count)`.
+    Their floating point sums leave rounding residue, so results are checked against
+    an exact run with `TickScale(0.5, lot_size=0.1)`.
+    """
+    def factory(rng: random.Random, count: int, quantities=DECIMAL_QUANTITIES, prices=DECIMAL_PRICES):
+        return make_orders(rng, count, quantities, prices)
+    return factory
+
+
+@pytest.fixture
+def large_orders():
+    """
+    Factory of random books mixing billions of shares with single shares,
+    `large_orders(rng, count)`.
+    """
+    def factory(rng: random.Random, count: int, quantities=LARGE_QUANTITIES, prices=PRICES):
+        return make_orders(rng, count, quantities, prices)
+    return factory
@@ -0,0 +1,54 @@
+import random
+
+import pytest
+
+from coral.allocation import allocation_report
+from coral.core import run_auction, pro_rata, Order, AuctionOrder
+
+
+def test_pro_rata():
+    assert pro_rata(0, [1, 2]) == [0, 0]
+    assert pro_rata(30, [1, 2]) == [10, 20]
+    assert pro_rata(10, [1, 1, 1], whole_shares=True) == [4, 3, 3]
+    assert pro_rata(5, [1, 2, 2], whole_shares=True) == [1, 2, 2]
+    # Ties are broken by position
+    assert pro_rata(2, [1, 1, 1], whole_shares=True) == [1, 1, 0]
+
+
+def test_split_allocation():
+    orders = [Order(user_id=f"U{i}", order_type="BUY", q=10, p=100) for i in range(3)]
+    auction_order = AuctionOrder(orders=orders, q=10, p=100, order_type="BUY")
+    assert auction_order.split_allocation() == [0, 0, 0]
+    auction_order.allocated = 30
+    assert auction_order.split_allocation() == [10, 10, 10]
+    auction_order.allocated = 20
+    assert auction_order.split_allocation(whole_shares=True) == [7, 7, 6]
+
+
+def test_allocation_report():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+        Order(user_id="U3", order_type="SELL", q=25, p=250),
+        Order(user_id="U4", order_type="SELL", q=25, p=250),
+        Order(user_id="U5", order_type="SELL", q=10, p=400),
+    ]
+    report = allocation_report(orders)
+    assert report.result == run_auction(orders)
+    assert list(report.filled) == [100, 50, 25, 25, 0]
+    orders[0].q = 61
+    report = allocation_report(orders, whole_shares=True)
+    assert report.fills() == {"U1": 61, "U2": 50, "U3": 6, "U4": 5, "U5": 0}
+    assert sum(report.filled[1:]) == report.result.q_max
+
+
+def test_allocation_report_numpy_engine(random_orders):
+    pytest.importorskip("numpy")
+    for seed in range(200):
+        rng = random.Random(seed)
+        orders = random_orders(rng, rng.randint(0, 60))
+        for whole_shares in (False, True):
+            expected = allocation_report(orders, whole_shares)
+            actual = allocation_report(orders, whole_shares, engine="numpy")
+            assert actual.result == expected.result
+            assert list(actual.filled) == pytest.approx(list(expected.filled)), seed
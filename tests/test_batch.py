@@ -0,0 +1,46 @@
+from array import array
+
+import pytest
+
+from coral.batch import BUY, SELL, OrderBatch
+from coral.core import run_auction, Order, AuctionResult, AuctionManager
+
+
+def test_order_batch():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+        Order(user_id="U3", order_type="SELL", q=25, p=250),
+    ]
+    batch = OrderBatch.from_orders(orders)
+    assert len(batch) == 3
+    assert list(batch.side) == [BUY, SELL, SELL]
+    assert list(batch) == orders
+    assert batch[1] == orders[1]
+    # The manager accepts a batch directly
+    assert AuctionManager(batch).sell_orders == AuctionManager(orders).sell_orders
+    expected = AuctionResult(q_max=75, p_min=250, p_max=300)
+    assert run_auction(batch) == expected
+    # Columns must have the same length
+    with pytest.raises(ValueError):
+        OrderBatch(["U1"], array("b", [BUY]), array("d", [1, 2]), array("d", [1]))
+
+
+def test_order_batch_numpy_engine():
+    np = pytest.importorskip("numpy")
+    batch = OrderBatch(
+        user_ids=np.array(["U1", "U2", "U3"]),
+        side=np.array([BUY, SELL, SELL], dtype=np.int8),
+        q=np.array([50, 100, 100], dtype=np.float64),
+        p=np.array([300, 200, 250], dtype=np.float64),
+    )
+    expected = AuctionResult(q_max=50, p_min=200, p_max=300)
+    assert run_auction(batch, engine="numpy") == expected
+    assert run_auction(batch) == expected
+
+
+def test_slotted_layout():
+    order = Order(user_id="U1", order_type="BUY", q=100, p=300)
+    assert not hasattr(order, "__dict__")
+    assert not hasattr(AuctionResult(q_max=0, p_min=None, p_max=None), "__dict__")
+    assert not hasattr(AuctionManager([order]).buy_orders[0], "__dict__")
@@ -0,0 +1,49 @@
+import random
+
+import pytest
+
+from coral.binary import load_orders, write_orders
+from coral.core import run_auction, Order, AuctionResult
+
+
+def test_binary_order_file(tmp_path):
+    rng = random.Random(5)
+    orders = [
+        Order(user_id=f"U{i}" * (i % 3), order_type=rng.choice(["BUY", "SELL"]),
+              q=rng.choice([1.5, 10, 25]), p=rng.choice([100, 150.25, 200]))
+        for i in range(101)
+    ]
+    path = tmp_path / "orders.bin"
+    write_orders(path, orders)
+    batch = load_orders(path)
+    assert len(batch) == len(orders)
+    assert list(batch) == orders
+    assert batch.user_ids[-1] == orders[-1].user_id
+    assert batch.user_ids[1:3] == [orders[1].user_id, orders[2].user_id]
+    assert run_auction(batch) == run_auction(orders)
+    # A loaded batch can be written back
+    write_orders(tmp_path / "copy.bin", batch)
+    assert list(load_orders(tmp_path / "copy.bin")) == orders
+
+
+def test_binary_order_file_numpy_engine(tmp_path):
+    np = pytest.importorskip("numpy")
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+        Order(user_id="U3", order_type="SELL", q=25, p=250),
+    ]
+    path = tmp_path / "orders.bin"
+    write_orders(path, orders)
+    batch = load_orders(path)
+    assert not np.asarray(batch.q).flags.owndata
+    assert run_auction(batch, engine="numpy") == AuctionResult(q_max=75, p_min=250, p_max=300)
+
+
+def test_invalid_binary_order_file(tmp_path):
+    path = tmp_path / "orders.bin"
+    write_orders(path, [])
+    assert len(load_orders(path)) == 0
+    path.write_bytes(b"not an order file at all")
+    with pytest.raises(ValueError):
+        load_orders(path)
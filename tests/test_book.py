@@ -0,0 +1,61 @@
+import random
+
+import pytest
+
+from coral.book import OrderBook
+from coral.core import run_auction, Order, AuctionResult, AuctionManager
+
+
+def test_order_book():
+    book = OrderBook([
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+    ])
+    assert book.clear() == AuctionResult(q_max=50, p_min=200, p_max=300)
+    # Clearing doesn't consume the book
+    assert book.clear() == AuctionResult(q_max=50, p_min=200, p_max=300)
+    book.insert(Order(user_id="U3", order_type="SELL", q=25, p=250))
+    assert book.clear() == AuctionResult(q_max=75, p_min=250, p_max=300)
+    book.amend("U3", p=350)
+    assert book.orders["U3"] == Order(user_id="U3", order_type="SELL", q=25, p=350)
+    assert book.clear() == AuctionResult(q_max=50, p_min=200, p_max=300)
+    assert book.cancel("U2").q == 50
+    assert "U2" not in book
+    assert len(book) == 2
+    assert book.clear() == AuctionResult(q_max=0, p_min=None, p_max=None)
+    with pytest.raises(KeyError):
+        book.cancel("U2")
+    with pytest.raises(ValueError):
+        book.insert(Order(user_id="U1", order_type="SELL", q=10, p=10))
+
+
+def test_order_book_matches_auction_manager():
+    rng = random.Random(3)
+    book = OrderBook()
+    for step in range(2000):
+        user_id = f"U{rng.randrange(100)}"
+        if user_id not in book:
+            book.insert(Order(user_id=user_id, order_type=rng.choice(["BUY", "SELL"]),
+                              q=rng.choice([10, 50]), p=rng.choice([100, 200, 300])))
+        elif rng.random() < 0.5:
+            book.cancel(user_id)
+        else:
+            book.amend(user_id, q=rng.choice([10, 50]), p=rng.choice([100, 200, 300]))
+        if step % 100 == 0:
+            orders = list(book)
+            manager = AuctionManager(orders)
+            assert book.to_manager().buy_orders == manager.buy_orders
+            assert book.to_manager().sell_orders == manager.sell_orders
+            assert book.clear() == run_auction(orders)
+
+
+def test_order_book_keeps_random_stream():
+    random.seed(5)
+    expected = [random.random() for _ in range(3)]
+    random.seed(5)
+    book = OrderBook()
+    values = []
+    for i in range(3):
+        book.insert(Order(user_id=f"U{i}", order_type="BUY", q=i + 1, p=100 + i))
+        values.append(random.random())
+    assert values == expected
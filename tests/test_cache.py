@@ -0,0 +1,69 @@
+import os
+
+import pytest
+
+from coral.batch import OrderBatch
+from coral.cache import AuctionCache, order_key
+from coral.core import run_auction, Order, AuctionResult
+
+
+ORDERS = [
+    Order(user_id="U1", order_type="BUY", q=100, p=300),
+    Order(user_id="U2", order_type="SELL", q=50, p=200),
+    Order(user_id="U3", order_type="SELL", q=25, p=250),
+]
+
+
+def test_order_key():
+    key = order_key(ORDERS)
+    assert order_key(ORDERS[::-1]) == key
+    assert order_key(OrderBatch.from_orders(ORDERS)) == key
+    # User ids don't change the result, so they don't change the key
+    assert order_key([Order(user_id="X", order_type="BUY", q=100, p=300)] + ORDERS[1:]) == key
+    assert order_key(ORDERS + [ORDERS[1]]) != key
+    assert order_key(ORDERS[:2]) != key
+    with pytest.raises(ValueError):
+        order_key(iter(ORDERS))
+
+
+def test_auction_cache():
+    cache = AuctionCache(max_entries=2)
+    expected = AuctionResult(q_max=75, p_min=250, p_max=300)
+    assert run_auction(ORDERS, cache=cache) == expected
+    assert (cache.hits, cache.misses) == (0, 1)
+    result = run_auction(ORDERS[::-1], cache=cache)
+    assert result == expected
+    assert (cache.hits, cache.misses) == (1, 1)
+    # Cached results are copies
+    result.q_max = 0
+    assert run_auction(ORDERS, cache=cache) == expected
+    # The least recently used result is evicted
+    run_auction(ORDERS[:2], cache=cache)
+    run_auction(ORDERS[1:], cache=cache)
+    assert len(cache) == 2
+    assert cache.get(order_key(ORDERS)) is None
+
+
+def test_auction_cache_on_disk(tmp_path):
+    expected = AuctionResult(q_max=75, p_min=250, p_max=300)
+    run_auction(ORDERS, cache=AuctionCache(path=str(tmp_path)))
+    cache = AuctionCache(path=str(tmp_path))
+    assert cache.get(order_key(ORDERS)) == expected
+    assert cache.hits == 1
+    assert run_auction(ORDERS[:1], cache=cache) == AuctionResult(q_max=0, p_min=None, p_max=None)
+    assert len(list(tmp_path.iterdir())) == 2
+
+
+def test_auction_cache_disk_limit(tmp_path):
+    books = [ORDERS[:1], ORDERS[:2], ORDERS[1:]]
+    cache = AuctionCache(max_entries=0, path=str(tmp_path), max_disk_entries=2)
+    run_auction(books[0], cache=cache)
+    run_auction(books[1], cache=cache)
+    # Reading a file makes it the most recently used one
+    assert cache.get(order_key(books[0])) is not None
+    run_auction(books[2], cache=cache)
+    assert sorted(path.stem for path in tmp_path.iterdir()) == sorted(order_key(book) for book in books[::2])
+    # A directory opened with a lower limit is pruned from the oldest file
+    os.utime(tmp_path / f"{order_key(books[0])}.json", (0, 0))
+    AuctionCache(path=str(tmp_path), max_disk_entries=1)
+    assert [path.stem for path in tmp_path.iterdir()] == [order_key(books[2])]
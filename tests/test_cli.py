@@ -0,0 +1,49 @@
+import io
+import json
+import random
+from dataclasses import asdict
+
+from coral.binary import write_orders
+from coral.cli import clear_files, find_order_files, main
+from coral.core import run_auction
+
+
+def test_clear_files(tmp_path, random_orders):
+    expected = {}
+    for seed in range(5):
+        orders = random_orders(random.Random(seed), 200)
+        path = tmp_path / f"auction{seed}.ndjson"
+        with open(path, "w") as file:
+            file.write("\n".join(json.dumps(asdict(order)) for order in orders))
+        expected[str(path)] = run_auction(orders)
+    orders = random_orders(random.Random(5), 200)
+    write_orders(str(tmp_path / "auction5.bin"), orders)
+    expected[str(tmp_path / "auction5.bin")] = run_auction(orders)
+    (tmp_path / "broken.csv").write_text("user_id,order_type,q,p\nU1,BUY,ten,100\n")
+    (tmp_path / "notes.txt").write_text("not an order file")
+
+    paths = find_order_files([str(tmp_path)])
+    assert len(paths) == 7
+    output = io.StringIO()
+    throughput = clear_files(paths, output, workers=2, prefetch=2)
+    lines = [json.loads(line) for line in output.getvalue().splitlines()]
+    assert [line["file"] for line in lines] == paths
+    for line in lines:
+        if line["file"].endswith("broken.csv"):
+            assert "error" in line
+            continue
+        assert (line["q_max"], line["p_min"], line["p_max"]) == tuple(asdict(expected[line["file"]]).values())
+        assert line["orders"] == 200
+    assert (throughput.auctions, throughput.orders, throughput.failed) == (6, 1200, 1)
+
+
+def test_main(tmp_path, capsys, random_orders):
+    path = tmp_path / "auction.ndjson"
+    orders = random_orders(random.Random(1), 200)
+    with open(path, "w") as file:
+        file.write("\n".join(json.dumps(asdict(order)) for order in orders))
+    output = tmp_path / "results.ndjson"
+    assert main([str(tmp_path / "*.ndjson"), "--engine", "compact", "--workers", "1",
+                 "--output", str(output)]) == 0
+    assert json.loads(output.read_text())["q_max"] == run_auction(orders).q_max
+    assert "1 auctions, 200 orders" in capsys.readouterr().err
@@ -0,0 +1,40 @@
+import random
+
+from coral.allocation import allocation_report
+from coral.compact import CompactAuction, compact_orders
+from coral.core import run_auction, Order, AuctionResult
+
+
+def test_compact_orders():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=10, p=300),
+        Order(user_id="U2", order_type="BUY", q=30, p=300),
+        Order(user_id="U3", order_type="BUY", q=10, p=300),
+        Order(user_id="U4", order_type="SELL", q=5, p=200),
+        Order(user_id="U5", order_type="SELL", q=50, p=250),
+    ]
+    buy_levels, sell_levels = compact_orders(orders)
+    assert [(level.p, level.q_total) for level in buy_levels] == [(300, 50)]
+    assert [order.user_id for order in buy_levels[0].orders] == ["U2", "U1", "U3"]
+    assert [(level.p, level.q_total) for level in sell_levels] == [(200, 5), (250, 50)]
+    auction = CompactAuction(orders)
+    assert auction.clear() == AuctionResult(q_max=50, p_min=250, p_max=300)
+    # Higher quantities are filled first inside a price level
+    assert auction.buy_levels[0].split_allocation() == [30, 10, 10]
+    auction.buy_levels[0].allocated = 35
+    assert auction.buy_levels[0].split_allocation() == [30, 2.5, 2.5]
+    # Clearing again starts from scratch
+    assert auction.clear() == AuctionResult(q_max=50, p_min=250, p_max=300)
+    assert [level.allocated for level in auction.sell_levels] == [5, 45]
+
+
+def test_compact_engine(random_orders):
+    for seed in range(200):
+        rng = random.Random(seed)
+        orders = random_orders(rng, rng.randint(0, 60))
+        assert run_auction(orders, engine="compact") == run_auction(orders)
+        for whole_shares in (False, True):
+            report = allocation_report(orders, whole_shares=whole_shares, engine="compact")
+            expected = allocation_report(orders, whole_shares=whole_shares)
+            assert report.result == expected.result
+            assert list(report.filled) == list(expected.filled)
@@ -0,0 +1,39 @@
+from coral.continuous import ContinuousAuction, Trade
+from coral.core import Order
+
+
+def test_continuous_auction():
+    auction = ContinuousAuction()
+    assert auction.best_bid() is None and auction.best_ask() is None
+    assert auction.submit(Order(user_id="S1", order_type="SELL", q=50, p=200)) == []
+    assert auction.submit(Order(user_id="S2", order_type="SELL", q=25, p=250)) == []
+    assert auction.submit(Order(user_id="S3", order_type="SELL", q=25, p=200)) == []
+    assert auction.submit(Order(user_id="S4", order_type="SELL", q=50, p=200)) == []
+    assert auction.best_ask().user_id == "S1"
+    # Equal levels are matched first in, first out, and larger quantities first
+    trades = auction.submit(Order(user_id="B1", order_type="BUY", q=140, p=300))
+    assert trades == [
+        Trade(buy_user_id="B1", sell_user_id="S1", q=50, p=200),
+        Trade(buy_user_id="B1", sell_user_id="S4", q=50, p=200),
+        Trade(buy_user_id="B1", sell_user_id="S3", q=25, p=200),
+        Trade(buy_user_id="B1", sell_user_id="S2", q=15, p=250),
+    ]
+    assert auction.volume == 140
+    assert auction.best_bid() is None
+    assert auction.best_ask().user_id == "S2"
+    # A buy order below the best ask rests in the book
+    assert auction.submit(Order(user_id="B2", order_type="BUY", q=30, p=240)) == []
+    assert auction.best_bid().user_id == "B2"
+    trades = auction.submit(Order(user_id="S5", order_type="SELL", q=40, p=230))
+    assert trades == [Trade(buy_user_id="B2", sell_user_id="S5", q=30, p=240)]
+    assert [(order.user_id, remaining) for order, remaining in auction.resting()] == [
+        ("S5", 10), ("S2", 10)]
+
+
+def test_continuous_auction_many_levels():
+    auction = ContinuousAuction()
+    for i in range(1000):
+        auction.submit(Order(user_id=f"S{i}", order_type="SELL", q=1, p=1000 - i))
+    trades = auction.submit(Order(user_id="B", order_type="BUY", q=10, p=1000))
+    assert [trade.p for trade in trades] == list(range(1, 11))
+    assert auction.best_ask().p == 11
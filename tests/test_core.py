@@ -1,4 +1,6 @@
-from coral.core import run_auction, Order, AuctionResult, AuctionManager, AuctionOrder
+import random
+
+from coral.core import run_auction, clear_levels, Order, AuctionResult, AuctionManager, AuctionOrder
 
 
 def test_auction_order():
@@ -181,6 +183,48 @@ def test_auction_manager():
     assert manager.p_min == 100
 
 
+def test_auction_manager_bulk_build(random_orders):
+    # The bulk build must match appending the orders one by one
+    orders = random_orders(random.Random(7), 500)
+    manager = AuctionManager(orders)
+    appended = AuctionManager([])
+    for order in orders:
+        if order.order_type == "BUY":
+            appended.append_to_buy_orders(order)
+        else:
+            appended.append_to_sell_orders(order)
+    assert manager.buy_orders == appended.buy_orders
+    assert manager.sell_orders == appended.sell_orders
+    # Equal orders keep their original order inside the group
+    for auction_order in manager.buy_orders + manager.sell_orders:
+        indexes = [orders.index(order) for order in auction_order.orders]
+        assert indexes == sorted(indexes)
+
+
+def test_allocate_orders_deep_book():
+    # Books deeper than the recursion limit must not raise RecursionError
+    levels = 5000
+    orders = [Order(user_id=f"B{i}", order_type="BUY", q=1, p=levels + i)
+              for i in range(levels)]
+    orders += [Order(user_id=f"S{i}", order_type="SELL", q=1, p=i)
+               for i in range(levels)]
+    expected = AuctionResult(q_max=levels, p_min=levels - 1, p_max=2 * levels - 1)
+    assert run_auction(orders) == expected
+
+
+def test_clear_levels(random_orders):
+    assert clear_levels([], [(100, 10)]) == AuctionResult(q_max=0, p_min=None, p_max=None)
+    assert clear_levels([(300, 100)], [(200, 50), (250, 25)]) == AuctionResult(
+        q_max=75, p_min=250, p_max=300)
+    rng = random.Random(11)
+    for _ in range(200):
+        orders = random_orders(rng, rng.randint(0, 40))
+        manager = AuctionManager(orders)
+        result = clear_levels([(order.p, order.q_total) for order in manager.buy_orders],
+                              [(order.p, order.q_total) for order in manager.sell_orders])
+        assert result == run_auction(orders)
+
+
 def test_no_buy_orders():
     order_1 = Order(user_id="U1", order_type="SELL", q=100, p=500)
     order_2 = Order(user_id="U2", order_type="SELL", q=60, p=40)
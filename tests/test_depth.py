@@ -0,0 +1,74 @@
+import random
+
+import pytest
+
+from coral.core import run_auction, Order, AuctionManager, AuctionResult
+from coral.depth import DepthIndex
+from coral.ticks import TickScale
+
+
+def test_depth_index():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+    ]
+    index = DepthIndex.from_manager(AuctionManager(orders))
+    assert index.result() == AuctionResult(q_max=50, p_min=200, p_max=300)
+    hypothetical = Order(user_id="U3", order_type="SELL", q=25, p=250)
+    assert index.what_if(hypothetical) == AuctionResult(q_max=75, p_min=250, p_max=300)
+    # The index is not modified by the queries
+    assert index.result() == AuctionResult(q_max=50, p_min=200, p_max=300)
+    assert DepthIndex([], []).result() == AuctionResult(q_max=0, p_min=None, p_max=None)
+
+
+def test_depth_index_matches_run_auction(random_orders):
+    rng = random.Random(13)
+    for _ in range(200):
+        orders = random_orders(rng, rng.randint(0, 30))
+        index = DepthIndex.from_orders(orders)
+        assert index.result() == run_auction(orders)
+        hypotheticals = random_orders(rng, 10)
+        for hypothetical, result in zip(hypotheticals, index.what_if_many(hypotheticals)):
+            assert result == run_auction(orders + [hypothetical]), (orders, hypothetical)
+
+
+def test_depth_index_decimal_quantities(decimal_orders):
+    # Decimal quantities leave rounding residue in the prefix sums, the prices must
+    # still be the ones of exact arithmetic.
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=1.7, p=2),
+        Order(user_id="U2", order_type="SELL", q=0.1, p=1),
+        Order(user_id="U3", order_type="SELL", q=0.3, p=2),
+    ]
+    result = DepthIndex.from_orders(orders).what_if(Order(user_id="X", order_type="SELL", q=0.2, p=1))
+    assert result == AuctionResult(q_max=pytest.approx(0.6), p_min=2, p_max=2)
+    scale = TickScale(0.5, lot_size=0.1)
+    rng = random.Random(31)
+    for _ in range(500):
+        orders = decimal_orders(rng, rng.randint(0, 12))
+        index = DepthIndex.from_orders(orders)
+        hypotheticals = decimal_orders(rng, 5)
+        for hypothetical, result in zip(hypotheticals, index.what_if_many(hypotheticals)):
+            expected = run_auction(orders + [hypothetical], scale=scale)
+            assert result == AuctionResult(q_max=pytest.approx(expected.q_max), p_min=expected.p_min,
+                                           p_max=expected.p_max), (orders, hypothetical)
+
+
+def test_depth_index_large_quantities(large_orders):
+    # Integer depths are compared exactly, a single share decides the price.
+    orders = [
+        Order(user_id="U1", order_type="SELL", q=2 * 10 ** 9, p=1),
+        Order(user_id="U2", order_type="SELL", q=1, p=2),
+        Order(user_id="U3", order_type="BUY", q=2 * 10 ** 9 + 1, p=3),
+    ]
+    index = DepthIndex.from_orders(orders)
+    assert index.result() == run_auction(orders) == AuctionResult(q_max=2 * 10 ** 9 + 1, p_min=2, p_max=3)
+    assert index.what_if(Order(user_id="X", order_type="BUY", q=1, p=0)) == run_auction(orders)
+    rng = random.Random(41)
+    for _ in range(300):
+        orders = large_orders(rng, rng.randint(0, 20))
+        index = DepthIndex.from_orders(orders)
+        assert index.result() == run_auction(orders)
+        hypotheticals = large_orders(rng, 5)
+        for hypothetical, result in zip(hypotheticals, index.what_if_many(hypotheticals)):
+            assert result == run_auction(orders + [hypothetical]), (orders, hypothetical)
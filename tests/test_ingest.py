@@ -0,0 +1,62 @@
+import random
+import threading
+import time
+
+from coral.core import run_auction, Order, AuctionManager, AuctionResult
+from coral.ingest import ConcurrentOrderCollector
+
+
+def test_concurrent_order_collector(random_orders):
+    orders = random_orders(random.Random(29), 4000)
+    collector = ConcurrentOrderCollector()
+    barrier = threading.Barrier(8)
+    sequences = {}
+    submitters = {}
+
+    def submit(thread, chunk):
+        barrier.wait()
+        numbers = []
+        for start in range(0, len(chunk), 5):
+            if thread % 2:
+                numbers += collector.submit_many(chunk[start:start + 5])
+            else:
+                numbers += [collector.submit(order) for order in chunk[start:start + 5]]
+            # Hand over the GIL so the submissions of the threads interleave.
+            time.sleep(0)
+        sequences.update(zip(map(id, chunk), numbers))
+        submitters.update((number, thread) for number in numbers)
+
+    threads = [threading.Thread(target=submit, args=(i, orders[i::8])) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert len(collector) == len(orders)
+    assert sorted(sequences.values()) == list(range(len(orders)))
+    assert sum(submitters[number] != submitters[number - 1] for number in range(1, len(orders))) > len(threads)
+    manager = collector.manager()
+    # The levels hold the same multiset of orders as a sequential build, each one in
+    # arrival order.
+    for auction_order in manager.buy_orders + manager.sell_orders:
+        numbers = [sequences[id(order)] for order in auction_order.orders]
+        assert numbers == sorted(numbers)
+    expected = AuctionManager(sorted(orders, key=lambda order: sequences[id(order)]))
+    assert manager.buy_orders == expected.buy_orders
+    assert manager.sell_orders == expected.sell_orders
+    manager.allocate_orders()
+    assert AuctionResult(q_max=manager.allocated, p_min=manager.p_min, p_max=manager.p_max) == run_auction(orders)
+    # Draining empties the collector
+    assert len(collector) == 0
+    assert collector.drain() == ([], [])
+
+
+def test_submit_many():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+        Order(user_id="U3", order_type="SELL", q=50, p=200),
+    ]
+    collector = ConcurrentOrderCollector()
+    assert collector.submit_many(orders) == [0, 1, 2]
+    manager = AuctionManager(orders)
+    assert collector.drain() == (manager.buy_orders, manager.sell_orders)
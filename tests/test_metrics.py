@@ -0,0 +1,49 @@
+import pytest
+
+from coral.core import run_auction, Order, AuctionManager
+from coral.metrics import AuctionMetrics, MetricsRegistry
+
+
+def test_auction_metrics():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="BUY", q=100, p=300),
+        Order(user_id="U3", order_type="BUY", q=10, p=100),
+        Order(user_id="U4", order_type="SELL", q=50, p=200),
+        Order(user_id="U5", order_type="SELL", q=25, p=250),
+        Order(user_id="U6", order_type="SELL", q=25, p=350),
+    ]
+    recorded = []
+    manager = AuctionManager(orders, metrics_sink=recorded.append)
+    manager.allocate_orders()
+    assert recorded == [manager.metrics]
+    metrics = recorded[0]
+    assert metrics.orders == 6
+    assert metrics.levels_created == 5
+    assert metrics.orders_merged == 1
+    assert metrics.match_iterations == 2
+    # The buy level at 300 and the sell levels at 200, 250 and 350
+    assert metrics.levels_visited == 4
+    assert metrics.grouping >= 0 and metrics.sorting >= 0 and metrics.matching >= 0
+    # Without a sink nothing is measured
+    assert AuctionManager(orders).metrics is None
+
+
+def test_metrics_registry():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+    ]
+    registry = MetricsRegistry()
+    run_auction(orders, metrics_sink=registry)
+    run_auction(orders, metrics_sink=registry)
+    assert registry.auctions == 2
+    assert registry.totals.match_iterations == 2
+    text = registry.render()
+    assert "coral_auctions_total 2\n" in text
+    assert 'coral_phase_seconds_total{phase="matching"}' in text
+    assert "coral_levels_created_total 4\n" in text
+    with pytest.raises(ValueError):
+        run_auction(orders, engine="streaming", metrics_sink=registry)
+    registry(AuctionMetrics(orders=1))
+    assert registry.totals.orders == 5
@@ -0,0 +1,26 @@
+import random
+
+import pytest
+
+from coral.batch import OrderBatch
+from coral.core import run_auction, Order
+from coral.parallel import run_auctions
+
+
+def test_run_auctions(random_orders):
+    rng = random.Random(9)
+    auctions = {f"S{i}": random_orders(rng, rng.randint(0, 50)) for i in range(40)}
+    auctions["BIG"] = random_orders(rng, 3000)
+    auctions["BATCH"] = OrderBatch.from_orders(random_orders(rng, 20))
+    results = run_auctions(auctions, max_workers=2, chunk_size=100, shared_memory_size=1000)
+    assert list(results) == list(auctions)
+    for symbol, orders in auctions.items():
+        assert results[symbol] == run_auction(orders), symbol
+
+
+def test_run_auctions_error():
+    orders = [Order(user_id=f"U{i}", order_type="BUY" if i % 2 else "SELL", q=1, p=100 + i) for i in range(10)]
+    # The error of the auction is raised, not the one of closing the shared memory
+    for shared_memory_size in (5, 100):
+        with pytest.raises(ValueError, match="engine"):
+            run_auctions({"S": orders}, engine="unknown", max_workers=1, shared_memory_size=shared_memory_size)
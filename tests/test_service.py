@@ -0,0 +1,73 @@
+import asyncio
+import json
+
+from coral.core import AuctionResult
+from coral.service import AuctionService
+
+
+async def send(host, port, *messages):
+    reader, writer = await asyncio.open_connection(host, port)
+    answers = []
+    for message in messages:
+        writer.write(json.dumps(message).encode() + b"\n")
+        await writer.drain()
+        answers.append(json.loads(await reader.readline()))
+    writer.close()
+    return answers
+
+
+async def run_service():
+    service = AuctionService(window=0.3, max_orders=3)
+    host, port = await service.start()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"type": "subscribe"}\n')
+    await writer.drain()
+    queue = service.subscribe()
+    answers = [
+        await send(host, port, {"type": "order", "user_id": "U1", "order_type": "BUY", "q": 100, "p": 300}),
+        await send(host, port, {"type": "order", "user_id": "U2", "order_type": "SELL", "q": 50, "p": 200}),
+        await send(host, port,
+                   {"type": "order", "user_id": "U3", "order_type": "SELL", "q": 10, "p": 250},
+                   {"type": "order", "user_id": "U3", "order_type": "SELL", "q": 25, "p": 250},
+                   {"type": "order", "user_id": "U4", "order_type": "SELL", "q": 25, "p": 250},
+                   {"type": "cancel", "user_id": "U5"},
+                   {"type": "unknown"}),
+    ]
+    published = json.loads(await asyncio.wait_for(reader.readline(), 5))
+    auction, result = await queue.get()
+    writer.close()
+    await service.close()
+    assert await queue.get() is None
+    return answers, published, auction, result
+
+
+def test_auction_service():
+    answers, published, auction, result = asyncio.run(run_service())
+    assert answers[0] == [{"type": "ack", "user_id": "U1", "auction": 0}]
+    assert [answer["type"] for answer in answers[2]] == ["ack", "ack", "error", "error", "error"]
+    assert auction == 0
+    assert result == AuctionResult(q_max=75, p_min=250, p_max=300)
+    assert published == {"type": "result", "auction": 0, "q_max": 75, "p_min": 250, "p_max": 300}
+
+
+
+async def send_oversized():
+    service = AuctionService(window=10)
+    host, port = await service.start()
+    reader, writer = await asyncio.open_connection(host, port)
+    writer.write(b'{"type": "cancel", "user_id": "' + b"x" * 100_000 + b'"}\n')
+    await writer.drain()
+    answer = json.loads(await asyncio.wait_for(reader.readline(), 5))
+    closed = await asyncio.wait_for(reader.read(), 5)
+    writer.close()
+    # The service still accepts other clients
+    answers = await send(host, port, {"type": "order", "user_id": "U1", "order_type": "BUY", "q": 100, "p": 300})
+    await service.close()
+    return answer, closed, answers
+
+
+def test_auction_service_oversized_message():
+    answer, closed, answers = asyncio.run(send_oversized())
+    assert answer == {"type": "error", "message": "message too long"}
+    assert closed == b""
+    assert answers == [{"type": "ack", "user_id": "U1", "auction": 0}]
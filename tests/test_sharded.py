@@ -0,0 +1,20 @@
+import random
+
+from coral.batch import OrderBatch
+from coral.core import run_auction, AuctionManager
+from coral.sharded import group_orders_sharded, sharded_manager
+
+
+def test_group_orders_sharded(random_orders):
+    orders = random_orders(random.Random(21), 1000)
+    manager = AuctionManager(orders)
+    buy_orders, sell_orders = group_orders_sharded(orders, shards=7, max_workers=2)
+    assert buy_orders == manager.buy_orders
+    assert sell_orders == manager.sell_orders
+    batch = OrderBatch.from_orders(orders)
+    assert group_orders_sharded(batch, shards=3, max_workers=2) == (buy_orders, sell_orders)
+    sharded = sharded_manager(orders, shards=4, max_workers=2)
+    sharded.allocate_orders()
+    assert (sharded.allocated, sharded.p_min, sharded.p_max) == tuple(
+        getattr(run_auction(orders), name) for name in ("q_max", "p_min", "p_max"))
+    assert group_orders_sharded([], shards=2, max_workers=1) == ([], [])
@@ -0,0 +1,46 @@
+import random
+
+import pytest
+
+from coral.core import Order, AuctionManager
+from coral.snapshot import dumps_snapshot, load_snapshot, loads_snapshot, write_snapshot
+
+
+def state(manager):
+    return (manager.buy_orders, manager.sell_orders, manager.allocated, manager.p_min,
+            manager.p_max, manager.buy_index, manager.sell_index)
+
+
+def test_snapshot(tmp_path):
+    rng = random.Random(23)
+    orders = [
+        Order(user_id=f"U{i}" * (i % 3 + 1), order_type=rng.choice(["BUY", "SELL"]),
+              q=float(rng.choice([1, 10, 25])), p=float(rng.choice([100, 150, 200, 250])))
+        for i in range(300)
+    ]
+    manager = AuctionManager(orders)
+    assert state(loads_snapshot(dumps_snapshot(manager))) == state(manager)
+    manager.allocate_orders()
+    path = tmp_path / "manager.snapshot"
+    write_snapshot(path, manager)
+    restored = load_snapshot(path)
+    assert state(restored) == state(manager)
+    # The restored manager keeps working
+    order = Order(user_id="U", order_type="SELL", q=5.0, p=100.0)
+    restored.append_to_sell_orders(order)
+    manager.append_to_sell_orders(order)
+    restored.allocate_orders()
+    manager.allocate_orders()
+    assert state(restored) == state(manager)
+
+
+def test_empty_snapshot(tmp_path):
+    manager = AuctionManager([])
+    restored = loads_snapshot(dumps_snapshot(manager))
+    assert state(restored) == state(manager)
+    with pytest.raises(ValueError):
+        loads_snapshot(b"CORALSN1")
+    path = tmp_path / "manager.snapshot"
+    path.write_bytes(b"not a snapshot")
+    with pytest.raises(ValueError):
+        load_snapshot(path)
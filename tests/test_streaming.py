@@ -0,0 +1,39 @@
+import csv
+import json
+import random
+
+import pytest
+
+from coral.core import run_auction
+from coral.streaming import LevelAggregator, read_orders
+
+
+def test_level_aggregator(random_orders):
+    orders = random_orders(random.Random(1), 200)
+    aggregator = LevelAggregator(order for order in orders)
+    assert aggregator.orders == len(orders)
+    assert len(aggregator.buy_counts) + len(aggregator.sell_counts) == len(
+        {(order.order_type, order.p, order.q) for order in orders})
+    assert aggregator.clear() == run_auction(orders)
+    for seed in range(100):
+        orders = random_orders(random.Random(seed), seed)
+        assert run_auction(iter(orders), engine="streaming") == run_auction(orders)
+
+
+def test_order_files(tmp_path, random_orders):
+    orders = random_orders(random.Random(2), 200)
+    ndjson_path = tmp_path / "orders.ndjson"
+    with open(ndjson_path, "w") as file:
+        file.write("\n".join(json.dumps({"user_id": order.user_id, "order_type": order.order_type,
+                                         "q": order.q, "p": order.p}) for order in orders))
+    csv_path = tmp_path / "orders.csv"
+    with open(csv_path, "w", newline="") as file:
+        writer = csv.writer(file)
+        writer.writerow(["user_id", "order_type", "q", "p"])
+        writer.writerows([order.user_id, order.order_type, order.q, order.p] for order in orders)
+    assert list(read_orders(ndjson_path)) == orders
+    expected = run_auction(orders)
+    assert run_auction(str(ndjson_path), engine="streaming") == expected
+    assert run_auction(csv_path, engine="streaming") == expected
+    with pytest.raises(ValueError):
+        run_auction(tmp_path / "orders.txt", engine="streaming")
@@ -0,0 +1,88 @@
+import random
+
+import pytest
+
+from coral.core import run_auction, Order
+from coral.sweep import AddOrder, RemoveUser, ScaleSide, ScenarioSweep
+from coral.ticks import TickScale
+
+
+def test_leave_one_out(random_orders):
+    rng = random.Random(17)
+    for _ in range(100):
+        orders = random_orders(rng, rng.randint(0, 30))
+        table = ScenarioSweep(orders).leave_one_out()
+        assert len(table) == len(orders)
+        for scenario, result in zip(table.scenarios, table.results()):
+            remaining = [order for order in orders if order.user_id != scenario.user_id]
+            assert result == run_auction(remaining), (orders, scenario)
+
+
+def test_leave_one_out_large_quantities(large_orders):
+    orders = [
+        Order(user_id="U1", order_type="SELL", q=2 * 10 ** 9, p=1),
+        Order(user_id="U2", order_type="SELL", q=1, p=2),
+        Order(user_id="U3", order_type="BUY", q=2 * 10 ** 9 + 1, p=3),
+        Order(user_id="X", order_type="BUY", q=5, p=0.5),
+    ]
+    assert ScenarioSweep(orders).evaluate(RemoveUser("X")) == run_auction(orders[:3])
+    rng = random.Random(43)
+    for _ in range(200):
+        orders = large_orders(rng, rng.randint(0, 20))
+        # Users with several orders, some of them on the same level
+        for order in orders:
+            order.user_id = f"U{rng.randrange(6)}"
+        table = ScenarioSweep(orders).leave_one_out()
+        for scenario, result in zip(table.scenarios, table.results()):
+            remaining = [order for order in orders if order.user_id != scenario.user_id]
+            assert result == run_auction(remaining), (orders, scenario)
+
+
+def test_scenarios(random_orders):
+    rng = random.Random(19)
+    for _ in range(100):
+        orders = random_orders(rng, rng.randint(0, 30))
+        # A user with two orders
+        orders += [Order(user_id="U0", order_type="SELL", q=5, p=150)]
+        hypothetical = random_orders(rng, 1)[0]
+        factor = rng.choice([0, 0.5, 2, 3])
+        scenarios = [AddOrder(hypothetical), ScaleSide("BUY", factor), ScaleSide("SELL", factor),
+                     RemoveUser("U0"), RemoveUser("nobody")]
+        expected = [
+            run_auction(orders + [hypothetical]),
+            run_auction([Order(order.user_id, order.order_type, order.q * factor if order.order_type == "BUY"
+                               else order.q, order.p) for order in orders]),
+            run_auction([Order(order.user_id, order.order_type, order.q * factor if order.order_type == "SELL"
+                               else order.q, order.p) for order in orders]),
+            run_auction([order for order in orders if order.user_id != "U0"]),
+            run_auction(orders),
+        ]
+        assert list(ScenarioSweep(orders).run(scenarios).results()) == expected
+
+
+def test_unknown_scenario():
+    with pytest.raises(TypeError):
+        ScenarioSweep([]).evaluate("scenario")
+    assert ScenarioSweep([]).run([]).scenarios == []
+
+
+def test_leave_one_out_decimal_quantities(decimal_orders):
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=1.7, p=2),
+        Order(user_id="U2", order_type="SELL", q=0.1, p=1),
+        Order(user_id="U3", order_type="SELL", q=0.3, p=2),
+    ]
+    result = ScenarioSweep(orders).evaluate(RemoveUser("U3"))
+    assert (result.q_max, result.p_min, result.p_max) == (pytest.approx(0.1), 1, 2)
+    # Users with many orders are removed from the shared index
+    scale = TickScale(0.5, lot_size=0.1)
+    rng = random.Random(37)
+    for _ in range(300):
+        orders = decimal_orders(rng, rng.randint(0, 15))
+        for order in orders:
+            order.user_id = f"U{rng.randrange(5)}"
+        table = ScenarioSweep(orders).leave_one_out()
+        for scenario, result in zip(table.scenarios, table.results()):
+            expected = run_auction([order for order in orders if order.user_id != scenario.user_id], scale=scale)
+            assert (result.q_max, result.p_min, result.p_max) == (
+                pytest.approx(expected.q_max), expected.p_min, expected.p_max), (orders, scenario)
@@ -0,0 +1,51 @@
+import pytest
+
+from coral.batch import OrderBatch
+from coral.core import run_auction, Order, AuctionManager, AuctionResult
+from coral.ticks import TickScale
+
+
+def test_tick_scale():
+    scale = TickScale(tick_size=0.05, lot_size=0.1)
+    assert scale.to_ticks(100.15) == 2003
+    assert scale.from_ticks(2003) == 100.15
+    assert scale.to_lots(0.3) == 3
+    assert scale.from_lots(3) == 0.3
+    with pytest.raises(ValueError):
+        scale.to_ticks(100.12)
+    with pytest.raises(ValueError):
+        TickScale(tick_size=0)
+
+
+def test_float_drift():
+    # 0.1 + 0.2 != 0.3 in floating point, so the float auction leaves the sell
+    # order almost fulfilled and keeps matching it.
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=0.1, p=10.05),
+        Order(user_id="U2", order_type="BUY", q=0.2, p=10.05),
+        Order(user_id="U3", order_type="SELL", q=0.3, p=10),
+        Order(user_id="U4", order_type="SELL", q=0.1, p=10.05),
+    ]
+    manager = AuctionManager(orders)
+    manager.allocate_orders()
+    assert manager.allocated != 0.3
+    scale = TickScale(tick_size=0.05, lot_size=0.1)
+    expected = AuctionResult(q_max=0.3, p_min=10.0, p_max=10.05)
+    assert run_auction(orders, scale=scale) == expected
+    assert run_auction(OrderBatch.from_orders(orders), scale=scale) == expected
+    assert run_auction(iter(orders), engine="streaming", scale=scale) == expected
+    assert run_auction(orders[:2], scale=scale) == AuctionResult(q_max=0, p_min=None, p_max=None)
+
+
+def test_numpy_engine_ticks():
+    pytest.importorskip("numpy")
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=0.1, p=10.05),
+        Order(user_id="U2", order_type="BUY", q=0.2, p=10.05),
+        Order(user_id="U3", order_type="SELL", q=0.3, p=10),
+    ]
+    scale = TickScale(tick_size=0.05, lot_size=0.1)
+    result = run_auction(scale.scale_orders(orders), engine="numpy")
+    assert result == AuctionResult(q_max=3, p_min=200, p_max=201)
+    assert isinstance(result.q_max, int)
+    assert run_auction(orders, engine="numpy", scale=scale) == AuctionResult(q_max=0.3, p_min=10.0, p_max=10.05)
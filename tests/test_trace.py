@@ -0,0 +1,47 @@
+import math
+
+import pytest
+
+from coral.core import run_auction, Order, AuctionManager
+from coral.metrics import MetricsRegistry
+from coral.trace import MatchTrace, TraceStep, load_trace, loads_trace
+
+
+ORDERS = [
+    Order(user_id="U1", order_type="BUY", q=100, p=300),
+    Order(user_id="U2", order_type="BUY", q=10, p=100),
+    Order(user_id="U3", order_type="SELL", q=50, p=200),
+    Order(user_id="U4", order_type="SELL", q=25, p=250),
+    Order(user_id="U5", order_type="SELL", q=25, p=350),
+]
+
+
+def test_match_trace(tmp_path):
+    trace = MatchTrace()
+    manager = AuctionManager(ORDERS, trace=trace)
+    manager.allocate_orders()
+    assert list(trace) == [
+        TraceStep(step=0, buy_index=0, sell_index=0, buy_p=300, sell_p=200, q=50, p_min=200, p_max=300),
+        TraceStep(step=1, buy_index=0, sell_index=1, buy_p=300, sell_p=250, q=25, p_min=250, p_max=300),
+    ]
+    path = tmp_path / "auction.trace"
+    trace.dump(str(path))
+    assert load_trace(str(path)) == list(trace)
+    with pytest.raises(ValueError):
+        loads_trace(b"not a trace")
+    # Without a trace the manager doesn't record anything
+    assert AuctionManager(ORDERS).trace is None
+
+
+def test_match_trace_ring_buffer():
+    trace = MatchTrace(capacity=3)
+    for _ in range(2):
+        run_auction(ORDERS, trace=trace, metrics_sink=MetricsRegistry())
+    assert (len(trace), trace.steps, trace.dropped) == (3, 4, 1)
+    assert [step.step for step in loads_trace(trace.dumps())] == [1, 2, 3]
+    trace.clear()
+    assert list(trace) == []
+    trace.record(0, 0, 300, 200, 10, None, None)
+    assert math.isnan(next(iter(trace)).p_min)
+    with pytest.raises(ValueError):
+        run_auction(ORDERS, engine="numpy", trace=trace)
@@ -0,0 +1,43 @@
+import random
+
+import pytest
+
+from coral.core import run_auction, Order, AuctionResult
+
+pytest.importorskip("numpy")
+
+
+def test_numpy_engine_examples():
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=300),
+        Order(user_id="U2", order_type="SELL", q=50, p=200),
+        Order(user_id="U3", order_type="SELL", q=25, p=250),
+    ]
+    assert run_auction(orders, engine="numpy") == AuctionResult(q_max=75, p_min=250, p_max=300)
+    orders = [
+        Order(user_id="U1", order_type="BUY", q=100, p=200),
+        Order(user_id="U2", order_type="SELL", q=50, p=300),
+    ]
+    assert run_auction(orders, engine="numpy") == AuctionResult(q_max=0, p_min=None, p_max=None)
+    assert run_auction([], engine="numpy") == AuctionResult(q_max=0, p_min=None, p_max=None)
+
+
+def test_numpy_engine_matches_python_engine(random_orders):
+    for seed in range(300):
+        rng = random.Random(seed)
+        orders = random_orders(rng, rng.randint(0, 80))
+        assert run_auction(orders, engine="numpy") == run_auction(orders), seed
+
+
+def test_unknown_engine():
+    with pytest.raises(ValueError):
+        run_auction([], engine="fortran")
+
+
+def test_numeric_fromiter():
+    from coral.vectorized import numeric_fromiter
+    assert numeric_fromiter(iter([1, 2, 3]), 3, 1).dtype.kind == "i"
+    # A leading integer doesn't make a fractional column integer
+    column = numeric_fromiter(iter([0, 0.25, 2]), 3, 0)
+    assert column.dtype.kind == "f" and list(column) == [0, 0.25, 2]
+    assert numeric_fromiter(iter([1.0, 2.0]), 2, 1.0).dtype.kind == "f"